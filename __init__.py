@@ -16,20 +16,27 @@ from homeassistant.core import Event, HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import discovery
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import STORAGE_DIR
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util import dt as dt_util
 
 from .const import (
     DATA_HASS_CONFIG,
+    DATA_RT_COORDINATORS,
     DOMAIN,
     CONF_ELECTRICITY_ENERGY_TAX_INCL_BTW,
     CONF_BTW_PERCENTAGE,
+    CONF_NATIVE_LIVE_FEED,
     CONF_PURCHASING_COMPENSATION,
+    CONF_RT_POWER_WINDOW,
     DEFAULT_ELECTRICITY_ENERGY_TAX_INCL_BTW,
     DEFAULT_BTW_PERCENTAGE,
+    DEFAULT_NATIVE_LIVE_FEED,
     DEFAULT_PURCHASING_COMPENSATION,
+    DEFAULT_RT_POWER_WINDOW,
 )
+from .services import async_setup_services
 
 PLATFORMS = [Platform.SENSOR]
 
@@ -41,6 +48,7 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Tibber component."""
     hass.data[DATA_HASS_CONFIG] = config
+    async_setup_services(hass)
     return True
 
 
@@ -53,6 +61,10 @@ def create_tibber_connection(hass: HomeAssistant, entry: ConfigEntry) -> Tibber:
         tax_rate=entry.options.get(CONF_BTW_PERCENTAGE, DEFAULT_BTW_PERCENTAGE),
         electricity_energy_tax_incl_btw=entry.options.get(CONF_ELECTRICITY_ENERGY_TAX_INCL_BTW, DEFAULT_ELECTRICITY_ENERGY_TAX_INCL_BTW),
         purchasing_compensation=entry.options.get(CONF_PURCHASING_COMPENSATION, DEFAULT_PURCHASING_COMPENSATION),
+        rt_power_window=entry.options.get(CONF_RT_POWER_WINDOW, DEFAULT_RT_POWER_WINDOW),
+        native_live_feed=entry.options.get(CONF_NATIVE_LIVE_FEED, DEFAULT_NATIVE_LIVE_FEED),
+        archive_path=hass.config.path(STORAGE_DIR, f"{DOMAIN}.hourly_archive.sqlite"),
+        cache_path=hass.config.path(STORAGE_DIR, f"{DOMAIN}.response_cache"),
     )
 
 
@@ -124,4 +136,5 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     if unload_ok:
         tibber_connection = hass.data[DOMAIN]
         await tibber_connection.rt_disconnect()
+        hass.data.pop(DATA_RT_COORDINATORS, None)
     return unload_ok
@@ -0,0 +1,155 @@
+"""Benchmark decoding and parsing of a 5-year hourly history payload.
+
+Builds a HISTORIC_DATA response with 43,800 hourly nodes (5 years) and
+measures:
+
+- decoding the raw body with the standard library, orjson and msgspec
+  (the ones that are installed), and with the decoder selected by
+  ``tibber.decoder``;
+- turning the nodes into ``HourlyNode`` records, which parse every
+  timestamp once, against parsing the ISO timestamp on each access as the
+  hourly store and the statistics import used to do, and the memory kept
+  by the dict nodes and by the records.
+
+Run from the repository root with the integration requirements installed::
+
+    python benchmarks/bench_historic_decode.py
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tibber.decoder import JSON_DECODER, json_loads  # noqa: E402
+from tibber.home import HourlyNode  # noqa: E402
+
+N_NODES = 5 * 365 * 24
+REPEAT = 5
+
+
+def build_payload(n_nodes: int = N_NODES) -> bytes:
+    """Return a HISTORIC_DATA response body with n_nodes hourly nodes."""
+    rnd = random.Random(1)
+    tz = dt.timezone(dt.timedelta(hours=1))
+    start = dt.datetime(2021, 1, 1, tzinfo=tz)
+    nodes = []
+    for hour in range(n_nodes):
+        consumption = round(rnd.uniform(0, 3), 3)
+        unit_price = round(rnd.uniform(0.1, 0.5), 4)
+        nodes.append(
+            {
+                "from": (start + dt.timedelta(hours=hour)).isoformat(timespec="milliseconds"),
+                "unitPrice": unit_price,
+                "totalCost": round(consumption * unit_price, 6),
+                "cost": round(consumption * unit_price, 6),
+                "consumption": consumption,
+            }
+        )
+    body = {
+        "data": {
+            "viewer": {
+                "home": {
+                    "consumption": {
+                        "pageInfo": {"hasPreviousPage": False, "startCursor": "MA=="},
+                        "nodes": nodes,
+                    }
+                }
+            }
+        }
+    }
+    return json.dumps(body).encode()
+
+
+def best_of(func: Callable[[], Any], repeat: int = REPEAT) -> float:
+    """Return the fastest of repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_memory(func: Callable[[], Any]) -> float:
+    """Return the peak memory allocated by func, in MiB."""
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 2**20
+
+
+def decoders() -> dict[str, Callable[[bytes], Any]]:
+    """Return the available decoders by name."""
+    found: dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+    try:
+        import orjson
+
+        found["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        found["msgspec"] = msgspec.json.Decoder().decode
+    except ImportError:
+        pass
+    return found
+
+
+def parse_on_access(nodes: list[dict[str, Any]]) -> None:
+    """Parse the timestamps as before the records: store key and statistics."""
+    for node in nodes:
+        int(dt.datetime.fromisoformat(node["from"]).timestamp())
+        dt.datetime.fromisoformat(node["from"])
+
+
+def parse_records(nodes: list[dict[str, Any]]) -> list[HourlyNode]:
+    """Build the hourly records, which parse the timestamp once."""
+    return [HourlyNode(node) for node in nodes]
+
+
+def retained_memory(func: Callable[[], Any]) -> float:
+    """Return the memory still allocated by the result of func, in MiB."""
+    tracemalloc.start()
+    result = func()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return current / 2**20
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    body = build_payload()
+    print(f"payload: {N_NODES} nodes, {len(body) / 2**20:.1f} MiB, selected decoder: {JSON_DECODER}")
+    print()
+    print(f"{'decode':<28}{'time (ms)':>12}{'peak (MiB)':>12}")
+    for name, loads in decoders().items():
+        print(f"{name:<28}{best_of(lambda: loads(body)):>12.1f}{peak_memory(lambda: loads(body)):>12.1f}")
+
+    nodes = json_loads(body)["data"]["viewer"]["home"]["consumption"]["nodes"]
+    print()
+    print(f"{'parse':<28}{'time (ms)':>12}{'kept (MiB)':>12}")
+    print(
+        f"{'dicts, parse on access':<28}{best_of(lambda: parse_on_access(nodes)):>12.1f}"
+        f"{retained_memory(lambda: json_loads(body)):>12.1f}"
+    )
+    print(
+        f"{'HourlyNode records':<28}{best_of(lambda: parse_records(nodes)):>12.1f}"
+        f"{retained_memory(lambda: parse_records(json_loads(body)['data']['viewer']['home']['consumption']['nodes'])):>12.1f}"
+    )
+
+if __name__ == "__main__":
+    main()
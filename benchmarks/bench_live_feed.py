@@ -0,0 +1,164 @@
+"""Benchmark the CPU time per live measurement of the realtime clients.
+
+Starts a local graphql-transport-ws server in a thread that sends
+``N_MESSAGES`` live measurements to each of ``HOMES`` subscriptions as fast
+as it can. Every home is received once through the gql Client with the
+``TibberWebsocketsTransport`` (the default path) and once through the
+``LiveFeedClient`` of ``tibber/live_feed.py``. Both multiplex the homes over
+one websocket.
+
+Prints the CPU time of the event loop thread per message, the server thread
+is not counted.
+
+Run from the repository root with the integration requirements installed::
+
+    python benchmarks/bench_live_feed.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from gql import Client, gql  # noqa: E402
+from websockets.asyncio.server import ServerConnection, serve  # noqa: E402
+
+from tibber.gql_queries import LIVE_SUBSCRIBE  # noqa: E402
+from tibber.live_feed import LiveFeedClient  # noqa: E402
+from tibber.websocker_transport import TibberWebsocketsTransport  # noqa: E402
+
+HOMES = 4
+N_MESSAGES = 5_000
+
+LIVE_MEASUREMENT = {
+    "accumulatedConsumption": 12.345,
+    "accumulatedConsumptionLastHour": 0.512,
+    "accumulatedCost": 3.21,
+    "accumulatedProduction": 0.0,
+    "accumulatedProductionLastHour": 0.0,
+    "accumulatedReward": None,
+    "averagePower": 612.4,
+    "currency": "EUR",
+    "currentL1": 1.2,
+    "currentL2": 0.8,
+    "currentL3": 0.9,
+    "lastMeterConsumption": 23456.789,
+    "lastMeterProduction": 0.0,
+    "maxPower": 3456.0,
+    "minPower": 120.0,
+    "power": 640.0,
+    "powerFactor": 0.97,
+    "powerProduction": 0.0,
+    "powerReactive": 12.0,
+    "signalStrength": -71,
+    "timestamp": "2025-11-03T12:34:56.000+01:00",
+    "voltagePhase1": 231.2,
+    "voltagePhase2": 230.8,
+    "voltagePhase3": 232.0,
+}
+
+
+async def handler(websocket: ServerConnection) -> None:
+    """Acknowledge the connection and answer every subscribe with the live measurements."""
+    await websocket.recv()
+    await websocket.send(json.dumps({"type": "connection_ack"}))
+
+    async def _send(subscription_id: str) -> None:
+        frame = json.dumps(
+            {"id": subscription_id, "type": "next", "payload": {"data": {"liveMeasurement": LIVE_MEASUREMENT}}}
+        )
+        for _ in range(N_MESSAGES):
+            await websocket.send(frame)
+        await websocket.send(json.dumps({"id": subscription_id, "type": "complete"}))
+
+    senders = []
+    async for raw in websocket:
+        message = json.loads(raw)
+        if message["type"] == "subscribe":
+            senders.append(asyncio.create_task(_send(message["id"])))
+    await asyncio.gather(*senders, return_exceptions=True)
+
+
+def start_server() -> tuple[int, Callable[[], None]]:
+    """Start the server in a thread, return its port and a function that stops it."""
+    loop = asyncio.new_event_loop()
+    started: asyncio.Future[int] = asyncio.Future(loop=loop)
+    stop = loop.create_future()
+
+    async def _run() -> None:
+        async with serve(handler, "127.0.0.1", 0, subprotocols=["graphql-transport-ws"]) as server:
+            started.set_result(server.sockets[0].getsockname()[1])
+            await stop
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(_run(),), daemon=True)
+    thread.start()
+    while not started.done():
+        time.sleep(0.01)
+
+    def _stop() -> None:
+        loop.call_soon_threadsafe(stop.set_result, None)
+        thread.join()
+
+    return started.result(), _stop
+
+
+async def consume(subscriptions: list[AsyncIterator[dict[str, Any]]]) -> tuple[int, float]:
+    """Read all subscriptions to the end, return the messages and the CPU seconds of this thread."""
+
+    async def _read(subscription: AsyncIterator[dict[str, Any]]) -> int:
+        count = 0
+        async for data in subscription:
+            count += data["liveMeasurement"]["power"] > 0
+        return count
+
+    start = time.thread_time()
+    counts = await asyncio.gather(*[_read(subscription) for subscription in subscriptions])
+    return sum(counts), time.thread_time() - start
+
+
+async def gql_path(url: str) -> tuple[int, float]:
+    """Receive the homes through the gql Client."""
+    client = Client(transport=TibberWebsocketsTransport(url, "token", "benchmark"))
+    session = await client.connect_async()
+    try:
+        document = gql(LIVE_SUBSCRIBE)
+        return await consume(
+            [session.subscribe(document, variable_values={"homeId": f"home-{home}"}) for home in range(HOMES)]
+        )
+    finally:
+        await client.close_async()
+
+
+async def live_feed_path(url: str) -> tuple[int, float]:
+    """Receive the homes through the LiveFeedClient."""
+    client = LiveFeedClient(url, "token", "benchmark")
+    await client.connect_async()
+    try:
+        return await consume([client.subscribe(f"home-{home}") for home in range(HOMES)])
+    finally:
+        await client.close_async()
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    port, stop = start_server()
+    url = f"ws://127.0.0.1:{port}"
+    try:
+        print(f"{'client':<16}{'messages':>10}{'CPU (s)':>10}{'CPU/msg (us)':>14}")
+        for name, path in (("gql", gql_path), ("live_feed", live_feed_path)):
+            messages, cpu = await path(url)
+            print(f"{name:<16}{messages:>10}{cpu:>10.2f}{cpu / messages * 1e6:>14.1f}")
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Benchmark live measurements per second through ``TibberHome._add_extra_data``.
+
+Feeds a stream of live measurements through the estimated hour
+consumption of a Tibber home, with the rolling power average, and through
+the former implementation (a list trimmed with ``pop(0)`` and summed for
+every message), for several message intervals. The shorter the interval,
+the more samples the 5 minute window holds.
+
+Run from the repository root with the integration requirements installed::
+
+    python benchmarks/bench_rt_extra_data.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import aiohttp  # noqa: E402
+
+from tibber import Tibber  # noqa: E402
+from tibber.home import TibberHome  # noqa: E402
+
+N_MESSAGES = 20_000
+INTERVALS = (2.0, 1.0, 0.1)
+
+
+def measurements(interval: float, n_messages: int = N_MESSAGES) -> list[dict[str, Any]]:
+    """Return live measurements sent every interval seconds."""
+    start = dt.datetime(2025, 11, 3, tzinfo=dt.UTC)
+    return [
+        {
+            "data": {
+                "liveMeasurement": {
+                    "timestamp": (start + dt.timedelta(seconds=index * interval)).isoformat(),
+                    "power": 500 + index % 1000,
+                    "accumulatedConsumptionLastHour": 0.5,
+                }
+            }
+        }
+        for index in range(n_messages)
+    ]
+
+
+def list_add_extra_data(home: TibberHome) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Return the former _add_extra_data, with the power samples in a list."""
+    rt_power: list[tuple[dt.datetime, float]] = []
+
+    def _add_extra_data(data: dict[str, Any]) -> dict[str, Any]:
+        live_data = data["data"]["liveMeasurement"]
+        _timestamp = dt.datetime.fromisoformat(live_data["timestamp"]).astimezone(home._tibber_control.time_zone)
+        while rt_power and rt_power[0][0] < _timestamp - dt.timedelta(minutes=5):
+            rt_power.pop(0)
+
+        rt_power.append((_timestamp, live_data["power"] / 1000))
+        current_hour = live_data["accumulatedConsumptionLastHour"]
+        if current_hour is not None:
+            power = sum(p[1] for p in rt_power) / len(rt_power)
+            live_data["estimatedHourConsumption"] = round(
+                current_hour + power * (3600 - (_timestamp.minute * 60 + _timestamp.second)) / 3600,
+                3,
+            )
+        return data
+
+    return _add_extra_data
+
+
+def rate(add_extra_data: Callable[[dict[str, Any]], dict[str, Any]], messages: list[dict[str, Any]]) -> float:
+    """Return the messages per second through add_extra_data."""
+    start = time.perf_counter()
+    for message in messages:
+        add_extra_data(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    async with aiohttp.ClientSession() as session:
+        tibber = Tibber(websession=session, user_agent="benchmark")
+        print(f"{'interval (s)':<14}{'samples':>10}{'list (msg/s)':>16}{'deque (msg/s)':>16}")
+        for interval in INTERVALS:
+            messages = measurements(interval)
+            old = rate(list_add_extra_data(TibberHome("old", tibber)), messages)
+            home = TibberHome("new", tibber)
+            new = rate(home._add_extra_data, messages)
+            print(f"{interval:<14g}{len(home._rt_power):>10}{old:>16,.0f}{new:>16,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
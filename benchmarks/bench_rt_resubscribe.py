@@ -0,0 +1,165 @@
+"""Benchmark the resubscribe of realtime homes after a websocket reconnect.
+
+Reconnects a fake websocket connection for several numbers of homes and
+resubscribes them, once with the home and account info refreshed by every
+home (``rt_resubscribe()``, the former reconnect path) and once as the
+watchdog does now: ``TibberRT._resubscribe_homes`` with the cached home info
+and a single account info refresh next to the reconnect. Every HTTP request
+takes ``HTTP_LATENCY`` seconds, the server acknowledges the connection after
+``ACK_DELAY`` seconds and sends the first live measurement
+``FIRST_MESSAGE_DELAY`` seconds after a subscribe.
+
+Prints the HTTP requests of a reconnect and the time to the first live
+measurement of the last home, measured from the start of the reconnect.
+
+Run from the repository root with the integration requirements installed::
+
+    python benchmarks/bench_rt_resubscribe.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import aiohttp  # noqa: E402
+
+from tibber import Tibber  # noqa: E402
+from tibber.gql_queries import INFO  # noqa: E402
+from tibber.home import TibberHome  # noqa: E402
+from tibber.websocker_transport import TibberWebsocketsTransport  # noqa: E402
+
+HOME_COUNTS = (1, 5, 20)
+HTTP_LATENCY = 0.25
+ACK_DELAY = 0.1
+FIRST_MESSAGE_DELAY = 0.05
+SUB_ENDPOINT = "wss://websocket-api.tibber.com/v1-beta/gql/subscriptions"
+
+
+class FakeTransport(TibberWebsocketsTransport):
+    """Websocket transport that is open without a socket."""
+
+    is_open = False
+
+    @property
+    def running(self) -> bool:
+        """Is real time subscription running."""
+        return self.is_open
+
+
+class FakeSession:
+    """Subscription session that sends live measurements."""
+
+    async def subscribe(self, document: Any, variable_values: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        """Yield a live measurement shortly after subscribing, then every 2 seconds."""
+        await asyncio.sleep(FIRST_MESSAGE_DELAY)
+        while True:
+            yield {"liveMeasurement": {"timestamp": "2025-11-03T12:00:00+01:00", "power": 500.0}}
+            await asyncio.sleep(2)
+
+
+class FakeClient:
+    """Subscription manager with a fake websocket connection."""
+
+    def __init__(self) -> None:
+        """Initialize the client."""
+        self.transport = FakeTransport(SUB_ENDPOINT, "token", "benchmark")
+        self.session = FakeSession()
+
+    async def connect_async(self) -> None:
+        """Open the connection once the server acknowledged it."""
+        await asyncio.sleep(ACK_DELAY)
+        self.transport.is_open = True
+
+    async def close_async(self) -> None:
+        """Close the connection."""
+        self.transport.is_open = False
+
+
+async def reconnect(tibber: Tibber, homes: list[TibberHome], refresh_info: bool) -> tuple[int, float]:
+    """Reconnect and resubscribe the homes, return the HTTP requests and seconds to the last first message."""
+    realtime = tibber.realtime
+    loop = asyncio.get_running_loop()
+    requests_before = sum(query.requests for query in tibber.metrics.queries.values())
+    first_messages: set[str] = set()
+    all_received = asyncio.Event()
+
+    def callback_for(home_id: str) -> Any:
+        def _callback(data: dict[str, Any]) -> None:
+            first_messages.add(home_id)
+            if len(first_messages) == len(homes):
+                all_received.set()
+
+        return _callback
+
+    for home in homes:
+        home._rt_callback = callback_for(home.home_id)
+    start = loop.time()
+    await realtime.sub_manager.close_async()
+    realtime._connected.clear()
+    realtime.connect_started = start
+    if refresh_info:
+        await realtime.sub_manager.connect_async()
+        realtime._connected.set()
+        await asyncio.gather(*[home.rt_resubscribe() for home in homes])
+    else:
+        refresh = asyncio.create_task(realtime._refresh_info())
+        await realtime.sub_manager.connect_async()
+        realtime._connected.set()
+        await realtime._resubscribe_homes()
+    await all_received.wait()
+    elapsed = loop.time() - start
+    if not refresh_info:
+        await refresh
+    for home in homes:
+        home.rt_unsubscribe()
+    return sum(query.requests for query in tibber.metrics.queries.values()) - requests_before, elapsed
+
+
+async def run(count: int, refresh_info: bool) -> tuple[int, float]:
+    """Return the HTTP requests and seconds of a reconnect with count homes."""
+    async with aiohttp.ClientSession() as session:
+        tibber = Tibber(websession=session, user_agent="benchmark")
+        home_ids = [f"home-{index}" for index in range(count)]
+
+        async def _execute(document, variable_values, timeout, retry, priority, metrics=None):
+            if metrics is not None:
+                metrics.requests += 1
+            await asyncio.sleep(HTTP_LATENCY)
+            if document == INFO:
+                return {"viewer": {"websocketSubscriptionUrl": SUB_ENDPOINT, "homes": []}}
+            home = {"id": variable_values["homeId"], "features": {"realTimeConsumptionEnabled": True}}
+            return {"viewer": {"home": home}}
+
+        tibber._execute = _execute
+        tibber.realtime.sub_endpoint = SUB_ENDPOINT
+        tibber.realtime.sub_manager = FakeClient()
+        homes = [TibberHome(home_id, tibber) for home_id in home_ids]
+        for home in homes:
+            await home.update_info()
+            tibber.realtime.add_home(home)
+        await tibber.realtime.sub_manager.connect_async()
+        result = await reconnect(tibber, homes, refresh_info)
+        tibber.realtime._watchdog_running = False
+        if tibber.realtime._watchdog_runner is not None:
+            tibber.realtime._watchdog_runner.cancel()
+        return result
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    print(f"{'homes':<8}{'per home':>24}{'once per reconnect':>24}")
+    print(f"{'':<8}{'requests':>12}{'seconds':>12}{'requests':>12}{'seconds':>12}")
+    for count in HOME_COUNTS:
+        old_requests, old_seconds = await run(count, refresh_info=True)
+        new_requests, new_seconds = await run(count, refresh_info=False)
+        print(f"{count:<8}{old_requests:>12}{old_seconds:>12.2f}{new_requests:>12}{new_seconds:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
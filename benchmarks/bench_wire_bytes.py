@@ -0,0 +1,166 @@
+"""Benchmark the bytes on the wire of one refresh cycle.
+
+Compares, for one home:
+
+- the request body of the batched refresh and of the per-home queries,
+  with the documents as written in ``tibber/gql_queries.py`` and with the
+  minified documents that are sent;
+- the response body of the batched refresh (two days of quarter-hour
+  prices and a day of hourly consumption) and of a 744-hour history page,
+  uncompressed and with gzip and brotli (when installed) content encoding.
+
+Run from the repository root with the integration requirements installed::
+
+    python benchmarks/bench_wire_bytes.py
+"""
+
+from __future__ import annotations
+
+import ast
+import datetime as dt
+import gzip
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tibber import gql_queries  # noqa: E402
+
+HOME_ID = "96a14971-525a-4420-aae9-e5aedaa129ff"
+
+
+def raw_documents() -> dict[str, str]:
+    """Return the documents of gql_queries as written, before minifying."""
+    tree = ast.parse((ROOT / "tibber" / "gql_queries.py").read_text(encoding="utf-8"))
+    documents = {}
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Call)
+            and isinstance(node.value.args[0], ast.Constant)
+        ):
+            documents[node.targets[0].id] = node.value.args[0].value
+    return documents
+
+
+def request_body(document: str, variables: dict[str, Any] | None = None) -> bytes:
+    """Return the JSON request body of a document."""
+    return json.dumps({"query": document, "variables": variables or {}}).encode()
+
+
+def batch_document(docs: dict[str, str]) -> str:
+    """Return the batched refresh document of one home."""
+    return docs["BATCH_HOMES"].format(docs["BATCH_HOME_VARIABLES"].format(0), docs["BATCH_HOME"].format(0))
+
+
+# a day of consumption, no production
+BATCH_VARIABLES = {
+    "homeId0": HOME_ID,
+    "consumptionLast0": 24,
+    "withConsumption0": True,
+    "productionLast0": None,
+    "withProduction0": False,
+}
+
+
+def price_entries(start: dt.datetime, level: bool = True) -> list[dict[str, Any]]:
+    """Return a day of quarter-hour price entries."""
+    rnd = random.Random(start.toordinal())
+    entries = []
+    for quarter in range(96):
+        energy = round(rnd.uniform(0.05, 0.35), 4)
+        entry: dict[str, Any] = {
+            "energy": energy,
+            "tax": round(energy * 0.21 + 0.1228, 4),
+            "total": round(energy * 1.21 + 0.1228, 4),
+            "startsAt": (start + dt.timedelta(minutes=15 * quarter)).isoformat(timespec="milliseconds"),
+        }
+        if level:
+            entry["level"] = rnd.choice(("VERY_CHEAP", "CHEAP", "NORMAL", "EXPENSIVE"))
+        entries.append(entry)
+    return entries
+
+
+def hourly_nodes(end: dt.datetime, hours: int) -> list[dict[str, Any]]:
+    """Return hourly consumption nodes ending at a moment."""
+    rnd = random.Random(hours)
+    nodes = []
+    for hour in range(hours, 0, -1):
+        consumption = round(rnd.uniform(0, 3), 3)
+        unit_price = round(rnd.uniform(0.1, 0.5), 4)
+        nodes.append(
+            {
+                "from": (end - dt.timedelta(hours=hour)).isoformat(timespec="milliseconds"),
+                "unitPrice": unit_price,
+                "totalCost": round(consumption * unit_price, 6),
+                "cost": round(consumption * unit_price, 6),
+                "consumption": consumption,
+            }
+        )
+    return nodes
+
+
+def batch_response() -> bytes:
+    """Return the response body of the batched refresh of one home."""
+    today = dt.datetime(2025, 11, 3, tzinfo=dt.timezone(dt.timedelta(hours=1)))
+    current = {**price_entries(today)[40], "currency": "EUR"}
+    home = {
+        "currentSubscription": {
+            "priceInfo": {
+                "current": current,
+                "today": price_entries(today),
+                "tomorrow": price_entries(today + dt.timedelta(days=1)),
+            }
+        },
+        "consumption": {"nodes": hourly_nodes(today, 24)},
+    }
+    return json.dumps({"data": {"viewer": {"h0": home}}}).encode()
+
+
+def history_response() -> bytes:
+    """Return the response body of one 744-hour history page."""
+    end = dt.datetime(2025, 11, 3, tzinfo=dt.timezone(dt.timedelta(hours=1)))
+    page = {"pageInfo": {"hasPreviousPage": True, "startCursor": "MjAyNS0xMA=="}, "nodes": hourly_nodes(end, 744)}
+    return json.dumps({"data": {"viewer": {"home": {"consumption": page}}}}).encode()
+
+
+def encodings() -> dict[str, Any]:
+    """Return the available content encodings by name."""
+    found: dict[str, Any] = {"identity": lambda body: body, "gzip": gzip.compress}
+    try:
+        import brotli
+
+        found["br"] = brotli.compress
+    except ImportError:
+        pass
+    return found
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    raw = raw_documents()
+    minified = {name: getattr(gql_queries, name) for name in raw}
+
+    print(f"{'request body (bytes)':<28}{'as written':>12}{'minified':>12}")
+    requests = {
+        "batched refresh": lambda docs: request_body(batch_document(docs), BATCH_VARIABLES),
+        "home info": lambda docs: request_body(docs["UPDATE_INFO"], {"homeId": HOME_ID}),
+        "price info": lambda docs: request_body(docs["UPDATE_PRICE_INFO"], {"homeId": HOME_ID}),
+        "live subscription": lambda docs: request_body(docs["LIVE_SUBSCRIBE"], {"homeId": HOME_ID}),
+    }
+    for name, build in requests.items():
+        print(f"{name:<28}{len(build(raw)):>12}{len(build(minified)):>12}")
+
+    responses = {"batched refresh": batch_response(), "history page (744 h)": history_response()}
+    print()
+    print(f"{'response body (bytes)':<28}" + "".join(f"{name:>12}" for name in encodings()))
+    for name, body in responses.items():
+        print(f"{name:<28}" + "".join(f"{len(compress(body)):>12}" for compress in encodings().values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,10 +24,14 @@ from .const import (
     DOMAIN,
     CONF_ELECTRICITY_ENERGY_TAX_INCL_BTW,
     CONF_BTW_PERCENTAGE,
+    CONF_NATIVE_LIVE_FEED,
     CONF_PURCHASING_COMPENSATION,
+    CONF_RT_POWER_WINDOW,
     DEFAULT_ELECTRICITY_ENERGY_TAX_INCL_BTW,
     DEFAULT_BTW_PERCENTAGE,
+    DEFAULT_NATIVE_LIVE_FEED,
     DEFAULT_PURCHASING_COMPENSATION,
+    DEFAULT_RT_POWER_WINDOW,
 )
 
 DATA_SCHEMA = vol.Schema({
@@ -99,6 +103,8 @@ class TibberConfigFlow(ConfigFlow, domain=DOMAIN):
                 CONF_ELECTRICITY_ENERGY_TAX_INCL_BTW: DEFAULT_ELECTRICITY_ENERGY_TAX_INCL_BTW,
                 CONF_BTW_PERCENTAGE: DEFAULT_BTW_PERCENTAGE,
                 CONF_PURCHASING_COMPENSATION: DEFAULT_PURCHASING_COMPENSATION,
+                CONF_RT_POWER_WINDOW: DEFAULT_RT_POWER_WINDOW,
+                CONF_NATIVE_LIVE_FEED: DEFAULT_NATIVE_LIVE_FEED,
             }
             return self.async_create_entry(
                 title=tibber_connection.name,
@@ -159,6 +165,16 @@ class OptionsFlowHandler(OptionsFlow):
                     CONF_PURCHASING_COMPENSATION,
                     default=self._config_entry.options.get(CONF_PURCHASING_COMPENSATION, DEFAULT_PURCHASING_COMPENSATION),
                 ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+
+                vol.Required(
+                    CONF_RT_POWER_WINDOW,
+                    default=self._config_entry.options.get(CONF_RT_POWER_WINDOW, DEFAULT_RT_POWER_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+
+                vol.Required(
+                    CONF_NATIVE_LIVE_FEED,
+                    default=self._config_entry.options.get(CONF_NATIVE_LIVE_FEED, DEFAULT_NATIVE_LIVE_FEED),
+                ): bool,
             }),
 
         )
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Constants for Tibber integration."""
 
 DATA_HASS_CONFIG = "tibber_adv_hass_config"
+DATA_RT_COORDINATORS = "tibber_adv_rt_coordinators"
 DOMAIN = "tibber_adv"
 MANUFACTURER = "Tibber"
 
@@ -8,8 +9,12 @@ MANUFACTURER = "Tibber"
 CONF_ELECTRICITY_ENERGY_TAX_INCL_BTW = "electricity_energy_tax_incl_btw"
 CONF_BTW_PERCENTAGE = "btw_percentage"
 CONF_PURCHASING_COMPENSATION = "purchasing_compensation"
+CONF_RT_POWER_WINDOW = "rt_power_window"
+CONF_NATIVE_LIVE_FEED = "native_live_feed"
 
 # Default values
 DEFAULT_ELECTRICITY_ENERGY_TAX_INCL_BTW = 0.1228  # Energiebelasting incl BTW per kWh (2024/2025)
 DEFAULT_BTW_PERCENTAGE = 21.0  # BTW percentage
 DEFAULT_PURCHASING_COMPENSATION = 0.0205  # Inkoopvergoeding excl BTW per kWh
+DEFAULT_RT_POWER_WINDOW = 300  # Seconden live vermogen voor het geschatte uurverbruik
+DEFAULT_NATIVE_LIVE_FEED = False  # Live metingen via de eigen graphql-transport-ws client i.p.v. gql
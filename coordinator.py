@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
 import logging
-from typing import cast
+from typing import Any, cast
+
+import aiohttp
 
 import tibber
 from .tibber import RetryableHttpExceptionError, FatalHttpExceptionError
+from .tibber.exceptions import CircuitOpenError
+from .tibber.home import history_cursor
 
 from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
@@ -19,12 +24,15 @@ from homeassistant.components.recorder.statistics import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN as TIBBER_DOMAIN
 
 FIVE_YEARS = 5 * 365 * 24
+BACKFILL_STORAGE_KEY = f"{TIBBER_DOMAIN}.statistics_backfill"
+BACKFILL_STORAGE_VERSION = 1
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,6 +53,13 @@ class TibberDataCoordinator(DataUpdateCoordinator[None]):  # pylint: disable=has
         )
         self._last_updated: datetime.datetime | None = None
         self._tibber_connection = tibber_connection
+        # Voortgang van de historische import per statistic_id, zodat een
+        # onderbroken import na een herstart verder gaat waar hij stopte
+        self._backfill_store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, BACKFILL_STORAGE_VERSION, BACKFILL_STORAGE_KEY
+        )
+        self._backfill: dict[str, dict[str, Any]] | None = None
+        self._backfill_tasks: dict[str, asyncio.Task[None]] = {}
 
     async def _async_update_data(self) -> None:
         """Update data via API."""
@@ -58,27 +73,48 @@ class TibberDataCoordinator(DataUpdateCoordinator[None]):  # pylint: disable=has
                 _LOGGER.debug("Not updating, last hour: {}".format(self._last_updated.hour))
                 return
             
-            for home in self._tibber_connection.get_homes(only_active=True):   
-                await home.update_info_and_price_info()
-
-
+            metrics = self._tibber_connection.metrics
+            with metrics.phase("update_cycle"):
+                # Prijzen, verbruik en productie van alle huizen in een request
+                with metrics.phase("update_homes"):
+                    await self._tibber_connection.update_active_homes()
+                self._last_updated = dt_util.now()
 
-            self._last_updated = dt_util.now()
-                
-           
-            await self._tibber_connection.fetch_consumption_data_active_homes()
-            await self._tibber_connection.fetch_production_data_active_homes()
-            await self._insert_statistics()
-        except RetryableHttpExceptionError as err:
-            raise UpdateFailed(f"Error communicating with API ({err.status})") from err
-        except FatalHttpExceptionError:
+                with metrics.phase("insert_statistics"):
+                    await self._insert_statistics()
+        except CircuitOpenError as err:
+            if not self._has_cached_prices():
+                raise UpdateFailed(str(err)) from err
+            _LOGGER.debug("Tibber API unavailable, serving the last fetched data")
+        except (RetryableHttpExceptionError, TimeoutError, aiohttp.ClientError) as err:
+            if not self._has_cached_prices():
+                status = getattr(err, "status", None) or type(err).__name__
+                raise UpdateFailed(f"Error communicating with API ({status})") from err
+            _LOGGER.warning("Error communicating with API, serving the last fetched data: %s", err)
+        except FatalHttpExceptionError as err:
+            if err.status in (502, 503, 504):
+                # Tijdelijke server problemen, herladen helpt dan niet
+                if not self._has_cached_prices():
+                    raise UpdateFailed(f"Error communicating with API ({err.status})") from err
+                _LOGGER.warning("Tibber API server problem, serving the last fetched data: %s", err)
+                return
             # Fatal error. Reload config entry to show correct error.
             self.hass.async_create_task(
                 self.hass.config_entries.async_reload(self.config_entry.entry_id)
             )
 
+    def _has_cached_prices(self) -> bool:
+        """Return True if an active home still has a price for the current time."""
+        return any(
+            home.current_price_key is not None
+            for home in self._tibber_connection.get_homes(only_active=True)
+        )
+
     async def _insert_statistics(self) -> None:
         """Insert Tibber statistics."""
+        if self._backfill is None:
+            self._backfill = await self._backfill_store.async_load() or {}
+
         for home in self._tibber_connection.get_homes():
             sensors: list[tuple[str, bool, str]] = []
             if home.hourly_consumption_data:
@@ -95,53 +131,64 @@ class TibberDataCoordinator(DataUpdateCoordinator[None]):  # pylint: disable=has
                     f"{home.home_id.replace('-', '')}"
                 )
 
+                metadata = StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{home.name} {sensor_type}",
+                    source=TIBBER_DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=unit,
+                )
+
                 last_stats = await get_instance(self.hass).async_add_executor_job(
                     get_last_statistics, self.hass, 1, statistic_id, True, set()
                 )
 
                 if not last_stats:
                     # First time we insert 5 years of data (if available)
-                    hourly_data = await home.get_historic_data(
-                        5 * 365 * 24, production=is_production
+                    self._start_backfill(
+                        home, statistic_id, sensor_type, is_production, metadata, restart=True
                     )
+                    continue
 
-                    _sum = 0.0
-                    last_stats_time = None
-                else:
-                    # hourly_consumption/production_data contains the last 30 days
-                    # of consumption/production data.
-                    # We update the statistics with the last 30 days
-                    # of data to handle corrections in the data.
-                    hourly_data = (
-                        home.hourly_production_data
-                        if is_production
-                        else home.hourly_consumption_data
+                backfill = self._backfill.get(statistic_id)
+                if backfill is not None and not backfill["done"]:
+                    # Resume an interrupted import of the history
+                    self._start_backfill(
+                        home, statistic_id, sensor_type, is_production, metadata
                     )
+                    continue
 
-                    from_time = dt_util.parse_datetime(hourly_data[0]["from"])
-                    if from_time is None:
-                        continue
-                    start = from_time - timedelta(hours=1)
-                    stat = await get_instance(self.hass).async_add_executor_job(
-                        statistics_during_period,
-                        self.hass,
-                        start,
-                        None,
-                        {statistic_id},
-                        "hour",
-                        None,
-                        {"sum"},
+                # hourly_consumption/production_data contains the last 30 days
+                # of consumption/production data.
+                # We update the statistics with the last 30 days
+                # of data to handle corrections in the data.
+                hourly_data = (
+                    home.hourly_production_data
+                    if is_production
+                    else home.hourly_consumption_data
+                )
+
+                start = hourly_data[0].time - timedelta(hours=1)
+                stat = await get_instance(self.hass).async_add_executor_job(
+                    statistics_during_period,
+                    self.hass,
+                    start,
+                    None,
+                    {statistic_id},
+                    "hour",
+                    None,
+                    {"sum"},
+                )
+                if statistic_id not in stat:
+                    self._start_backfill(
+                        home, statistic_id, sensor_type, is_production, metadata, restart=True
                     )
-                    if statistic_id in stat:
-                        first_stat = stat[statistic_id][0]
-                        _sum = cast(float, first_stat["sum"])
-                        last_stats_time = first_stat["start"]
-                    else:
-                        hourly_data = await home.get_historic_data(
-                            FIVE_YEARS, production=is_production
-                        )
-                        _sum = 0.0
-                        last_stats_time = None
+                    continue
+
+                first_stat = stat[statistic_id][0]
+                _sum = cast(float, first_stat["sum"])
+                last_stats_time = first_stat["start"]
 
                 statistics = []
 
@@ -155,8 +202,8 @@ class TibberDataCoordinator(DataUpdateCoordinator[None]):  # pylint: disable=has
                     if data.get(sensor_type) is None:
                         continue
 
-                    from_time = dt_util.parse_datetime(data["from"])
-                    if from_time is None or (
+                    from_time = data.time
+                    if (
                         last_stats_time_dt is not None
                         and from_time <= last_stats_time_dt
                     ):
@@ -172,12 +219,98 @@ class TibberDataCoordinator(DataUpdateCoordinator[None]):  # pylint: disable=has
                         )
                     )
 
-                metadata = StatisticMetaData(
-                    has_mean=False,
-                    has_sum=True,
-                    name=f"{home.name} {sensor_type}",
-                    source=TIBBER_DOMAIN,
-                    statistic_id=statistic_id,
-                    unit_of_measurement=unit,
-                )
                 async_add_external_statistics(self.hass, metadata, statistics)
+
+    def _start_backfill(
+        self,
+        home: tibber.TibberHome,
+        statistic_id: str,
+        sensor_type: str,
+        is_production: bool,
+        metadata: StatisticMetaData,
+        restart: bool = False,
+    ) -> None:
+        """Start the import of the history of a statistic in the background.
+
+        The update does not wait for the import, so prices and the other
+        statistics keep updating. Nothing is started if the import of the
+        statistic is already running.
+
+        :param restart: Start over from the oldest hour instead of resuming.
+        """
+        # pylint: disable=too-many-arguments
+        assert self._backfill is not None
+        if statistic_id in self._backfill_tasks:
+            return
+        if restart or "after" not in self._backfill.get(statistic_id, {"after": ""}):
+            # Een import van voor het vooruit pagineren telde de sommen af, opnieuw beginnen
+            self._backfill.pop(statistic_id, None)
+        task = self.config_entry.async_create_background_task(
+            self.hass,
+            self._backfill_statistics(home, statistic_id, sensor_type, is_production, metadata),
+            f"{TIBBER_DOMAIN} history import {statistic_id}",
+        )
+        self._backfill_tasks[statistic_id] = task
+        task.add_done_callback(lambda _: self._backfill_tasks.pop(statistic_id, None))
+
+    async def _backfill_statistics(
+        self,
+        home: tibber.TibberHome,
+        statistic_id: str,
+        sensor_type: str,
+        is_production: bool,
+        metadata: StatisticMetaData,
+    ) -> None:
+        """Import up to five years of history, one page at a time.
+
+        The history is paged forwards from the oldest hour and every page is
+        added to the statistics as it arrives, so only one page is in memory
+        and the sums always run up from the oldest hour. The cursor, sum and
+        remaining hours are stored after every page, so the import resumes
+        after a restart. An API error stops the import until the next update.
+        """
+        # pylint: disable=too-many-arguments
+        assert self._backfill is not None
+        state = self._backfill.setdefault(
+            statistic_id,
+            {
+                "after": history_cursor((dt_util.now() - timedelta(hours=FIVE_YEARS)).date()),
+                "sum": 0.0,
+                "remaining": FIVE_YEARS,
+                "done": False,
+            },
+        )
+        try:
+            async for nodes, cursor in home.iter_historic_data(
+                state["remaining"], state["after"], production=is_production
+            ):
+                _sum = state["sum"]
+                statistics = []
+                for data in nodes:
+                    if data.get(sensor_type) is None:
+                        continue
+                    _sum += data[sensor_type]
+                    statistics.append(
+                        StatisticData(start=data.time, state=data[sensor_type], sum=_sum)
+                    )
+                async_add_external_statistics(self.hass, metadata, statistics)
+
+                state["after"] = cursor or ""
+                state["sum"] = _sum
+                state["remaining"] -= len(nodes)
+                state["done"] = not cursor or state["remaining"] <= 0
+                await self._backfill_store.async_save(self._backfill)
+                _LOGGER.debug(
+                    "Imported %s hours of %s, %s remaining",
+                    len(nodes),
+                    statistic_id,
+                    0 if state["done"] else state["remaining"],
+                )
+        except (
+            CircuitOpenError,
+            RetryableHttpExceptionError,
+            FatalHttpExceptionError,
+            TimeoutError,
+            aiohttp.ClientError,
+        ) as err:
+            _LOGGER.warning("Import of the history of %s interrupted, resuming later: %s", statistic_id, err)
@@ -8,7 +8,7 @@ import tibber
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from .const import DATA_RT_COORDINATORS, DOMAIN
 
 
 async def async_get_config_entry_diagnostics(
@@ -19,17 +19,32 @@ async def async_get_config_entry_diagnostics(
 
     diagnostics_data = {}
 
+    rt_coordinators = hass.data.get(DATA_RT_COORDINATORS, {})
     homes = []
     for home in tibber_connection.get_homes(only_active=False):
-        homes.append(
-            {
-                "last_data_timestamp": home.last_data_timestamp,
-                "has_active_subscription": home.has_active_subscription,
-                "has_real_time_consumption": home.has_real_time_consumption,
-                "last_cons_data_timestamp": home.last_cons_data_timestamp,
-                "country": home.country,
+        home_data = {
+            "last_data_timestamp": home.last_data_timestamp,
+            "has_active_subscription": home.has_active_subscription,
+            "has_real_time_consumption": home.has_real_time_consumption,
+            "last_cons_data_timestamp": home.last_cons_data_timestamp,
+            "country": home.country,
+            "rt_mailbox": home.rt_mailbox_stats,
+        }
+        if rt_coordinator := rt_coordinators.get(home.home_id):
+            home_data["rt_state_writes"] = {
+                "written": sum(rt_coordinator.state_writes.values()),
+                "suppressed": sum(rt_coordinator.suppressed_state_writes.values()),
+                "written_per_sensor": dict(rt_coordinator.state_writes),
+                "suppressed_per_sensor": dict(rt_coordinator.suppressed_state_writes),
             }
-        )
+        homes.append(home_data)
     diagnostics_data["homes"] = homes
+    diagnostics_data["api"] = {
+        "available": tibber_connection.api_available,
+        "request_count": tibber_connection.request_count,
+        "coalesced_request_count": tibber_connection.coalesced_request_count,
+        "cached_request_count": tibber_connection.cached_request_count,
+        **tibber_connection.metrics.as_dict(),
+    }
 
     return diagnostics_data
@@ -5,6 +5,7 @@ import datetime
 from datetime import timedelta
 import logging
 from random import randrange
+import time
 from typing import Any, cast
 from .tibber import RetryableHttpExceptionError,FatalHttpExceptionError
 
@@ -32,7 +33,9 @@ from homeassistant.const import (
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfEnergy,
+    UnitOfInformation,
     UnitOfPower,
+    UnitOfTime,
 )
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import PlatformNotReady
@@ -49,7 +52,7 @@ from homeassistant.helpers.update_coordinator import (
 from dataclasses import dataclass
 from homeassistant.util import Throttle, dt as dt_util
 
-from .const import DOMAIN as TIBBER_DOMAIN, MANUFACTURER
+from .const import DATA_RT_COORDINATORS, DOMAIN as TIBBER_DOMAIN, MANUFACTURER
 from . import tibber
 from .coordinator import TibberDataCoordinator
 
@@ -95,149 +98,195 @@ class TibberSensorEntityDescription (SensorEntityDescription):
     native_unit_of_measurement_key: str | None = None
 
 
+@dataclass(frozen=True, kw_only=True)
+class TibberRtSensorEntityDescription(SensorEntityDescription):
+    """Description of a real time sensor with its state write policy.
 
-RT_SENSORS: tuple[SensorEntityDescription, ...] = (
-    SensorEntityDescription(
+    Unchanged values are never written. A changed value is only written
+    when at least min_interval seconds passed since the last write and it
+    differs more than the deadband from the last written value: the
+    absolute deadband or the relative one (a fraction of the last written
+    value), whichever is larger. With write_on_change every change is
+    written right away, for energy and money totals.
+    """
+
+    min_interval: float = 0
+    deadband: float = 0
+    relative_deadband: float = 0
+    write_on_change: bool = False
+
+
+
+RT_SENSORS: tuple[TibberRtSensorEntityDescription, ...] = (
+    TibberRtSensorEntityDescription(
         key="averagePower",
         translation_key="average_power",
         device_class=SensorDeviceClass.POWER,
         native_unit_of_measurement=UnitOfPower.WATT,
         suggested_display_precision=0,
+        min_interval=30,
+        deadband=5,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="power",
         translation_key="power",
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfPower.WATT,
         suggested_display_precision=0,
+        min_interval=5,
+        deadband=10,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="powerProduction",
         translation_key="power_production",
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfPower.WATT,
         suggested_display_precision=0,
+        min_interval=5,
+        deadband=10,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="minPower",
         translation_key="min_power",
         device_class=SensorDeviceClass.POWER,
         native_unit_of_measurement=UnitOfPower.WATT,
         suggested_display_precision=0,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="maxPower",
         translation_key="max_power",
         device_class=SensorDeviceClass.POWER,
         native_unit_of_measurement=UnitOfPower.WATT,
         suggested_display_precision=0,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedConsumption",
         translation_key="accumulated_consumption",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedConsumptionLastHour",
         translation_key="accumulated_consumption_last_hour",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="estimatedHourConsumption",
         translation_key="estimated_hour_consumption",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=4,
+        min_interval=10,
+        relative_deadband=0.01,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedProduction",
         translation_key="accumulated_production",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedProductionLastHour",
         translation_key="accumulated_production_last_hour",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="lastMeterConsumption",
         translation_key="last_meter_consumption",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="lastMeterProduction",
         translation_key="last_meter_production",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="voltagePhase1",
         translation_key="voltage_phase1",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        min_interval=30,
+        deadband=1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="voltagePhase2",
         translation_key="voltage_phase2",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        min_interval=30,
+        deadband=1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="voltagePhase3",
         translation_key="voltage_phase3",
         device_class=SensorDeviceClass.VOLTAGE,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        min_interval=30,
+        deadband=1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="currentL1",
         translation_key="current_l1",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
+        min_interval=5,
+        deadband=0.1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="currentL2",
         translation_key="current_l2",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
+        min_interval=5,
+        deadband=0.1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="currentL3",
         translation_key="current_l3",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
+        min_interval=5,
+        deadband=0.1,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="signalStrength",
         translation_key="signal_strength",
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
@@ -245,28 +294,34 @@ RT_SENSORS: tuple[SensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         suggested_display_precision=0,
+        min_interval=300,
+        deadband=3,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedReward",
         translation_key="accumulated_reward",
         device_class=SensorDeviceClass.MONETARY,
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="accumulatedCost",
         translation_key="accumulated_cost",
         device_class=SensorDeviceClass.MONETARY,
         state_class=SensorStateClass.TOTAL,
         suggested_display_precision=4,
+        write_on_change=True,
     ),
-    SensorEntityDescription(
+    TibberRtSensorEntityDescription(
         key="powerFactor",
         translation_key="power_factor",
         device_class=SensorDeviceClass.POWER_FACTOR,
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
+        min_interval=30,
+        deadband=1,
     ),
 )
 
@@ -293,6 +348,22 @@ SENSORS: tuple[SensorEntityDescription, ...] = (
     
 
 
+    SensorEntityDescription(
+        key="cheapest_window_1h",
+        translation_key="cheapest_window_1h",
+        device_class=SensorDeviceClass.TIMESTAMP,
+    ),
+    SensorEntityDescription(
+        key="cheapest_window_2h",
+        translation_key="cheapest_window_2h",
+        device_class=SensorDeviceClass.TIMESTAMP,
+    ),
+    SensorEntityDescription(
+        key="cheapest_window_3h",
+        translation_key="cheapest_window_3h",
+        device_class=SensorDeviceClass.TIMESTAMP,
+    ),
+
     TibberSensorEntityDescription(
         key="month_cost",
         translation_key="month_cost",
@@ -535,6 +606,43 @@ SENSORS: tuple[SensorEntityDescription, ...] = (
         icon=ICON,
         suggested_display_precision=4,
     ),
+    # API metrics, to spot slow update cycles
+    SensorEntityDescription(
+        key="update_cycle_duration",
+        translation_key="update_cycle_duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="batch_request_duration",
+        translation_key="batch_request_duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="api_bytes_received",
+        translation_key="api_bytes_received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="api_retry_count",
+        translation_key="api_retry_count",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
 
 )
 
@@ -570,11 +678,9 @@ async def async_setup_entry(
                 entities.append(TibberDataSensor(home, coordinator, entity_description))
 
         if home.has_real_time_consumption:
-            await home.rt_subscribe(
-                TibberRtDataCoordinator(
-                    async_add_entities, home, hass
-                ).async_set_updated_data
-            )
+            rt_coordinator = TibberRtDataCoordinator(async_add_entities, home, hass)
+            hass.data.setdefault(DATA_RT_COORDINATORS, {})[home.home_id] = rt_coordinator
+            await home.rt_subscribe(rt_coordinator.async_set_updated_data)
 
         # migrate
         old_id = home.info["viewer"]["home"]["meteringPointData"]["consumptionEan"]
@@ -730,6 +836,15 @@ class TibberDataSensor(TibberSensor, CoordinatorEntity["TibberDataCoordinator"])
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         
+        if self.entity_description.key.startswith("cheapest_window_"):
+            # cheapest_window_<n>h, the window itself is cached by the Tibber home
+            hours = int(self.entity_description.key.removeprefix("cheapest_window_")[:-1])
+            window = self._tibber_home.cheapest_window(hours)
+            self._attr_extra_state_attributes = {
+                "end": window.end if window else None,
+                "average_price": round(window.average, 5) if window else None,
+            }
+
         if self.entity_description.key == "electricity_price":
             _LOGGER.debug('Update electricity_price atributes')
 
@@ -748,24 +863,19 @@ class TibberDataSensor(TibberSensor, CoordinatorEntity["TibberDataCoordinator"])
             # fallback to _current_price_info which may come from the separate query.
             current: dict[str, Any] | None = None
             try:
-                now = dt_util.now().astimezone(self._tibber_home._tibber_control.time_zone)
-                # look for matching quarter-hour entry
-                for startsAt, entry in (getattr(self._tibber_home, "_price_info", {}) or {}).items():
-                    ts = entry.get("timestamp")
-                    if not isinstance(ts, datetime.datetime):
-                        continue
-                    if ts <= now < (ts + datetime.timedelta(minutes=15)):
-                        # found matching quarter-hour entry
-                        current = {
-                            "startsAt": startsAt,
-                            "total": entry.get("total"),  # The total price (energy + taxes)
-                            "energy": entry.get("energy"),  # Nord Pool spot price
-                            # The tax part of the price (guarantee of origin certificate, 
-                            # energy tax (Sweden only) and VAT). For NL: includes VAT on spot + fixed costs.
-                            "tax": entry.get("tax"),
-                            "level": self._tibber_home.price_level.get(startsAt),
-                        }
-                        break
+                # look up the quarter-hour entry covering now in the price timeline
+                startsAt = self._tibber_home.current_price_key
+                if startsAt is not None:
+                    entry = self._tibber_home.price_info[startsAt]
+                    current = {
+                        "startsAt": startsAt,
+                        "total": entry.get("total"),  # The total price (energy + taxes)
+                        "energy": entry.get("energy"),  # Nord Pool spot price
+                        # The tax part of the price (guarantee of origin certificate, 
+                        # energy tax (Sweden only) and VAT). For NL: includes VAT on spot + fixed costs.
+                        "tax": entry.get("tax"),
+                        "level": self._tibber_home.price_level.get(startsAt),
+                    }
 
                 # fallback to _current_price_info
                 if current is None:
@@ -790,25 +900,18 @@ class TibberDataSensor(TibberSensor, CoordinatorEntity["TibberDataCoordinator"])
             # collect next up to 6 upcoming quarter entries from _price_info
             upcoming: list[dict[str, Any]] = []
             try:
-                now = dt_util.now().astimezone(self._tibber_home._tibber_control.time_zone)
-                entries: list[tuple[datetime.datetime, str]] = []
-                for startsAt, entry in (getattr(self._tibber_home, "_price_info", {}) or {}).items():
-                    ts = entry.get("timestamp")
-                    if not isinstance(ts, datetime.datetime):
-                        continue
-                    if ts >= now:
-                        entries.append((ts, startsAt))
-                entries.sort()
-                for ts, startsAt in entries[:6]:
-                    entry = self._tibber_home._price_info.get(startsAt, {})
+                # the price timeline is already sorted by start time
+                timeline = self._tibber_home.price_timeline
+                first = timeline.index_from(dt_util.now())
+                for slot in timeline.slots[first:first + 6]:
                     upcoming.append(
                         {
-                            "startsAt": startsAt,
-                            "total": entry.get("total"),  # The total price (energy + taxes)
-                            "energy": entry.get("energy"),  # Nord Pool spot price
+                            "startsAt": slot.starts_at,
+                            "total": slot.total,  # The total price (energy + taxes)
+                            "energy": slot.energy,  # Nord Pool spot price
                             # The tax part (guarantee of origin, energy tax (Sweden only), VAT)
-                            "tax": entry.get("tax"),
-                            "level": self._tibber_home.price_level.get(startsAt),
+                            "tax": slot.tax,
+                            "level": slot.level,
                         }
                     )
             except Exception:
@@ -829,61 +932,53 @@ class TibberDataSensor(TibberSensor, CoordinatorEntity["TibberDataCoordinator"])
                 tomorrow_end = tomorrow_start + datetime.timedelta(days=1)
                 next_24h_end = now + datetime.timedelta(hours=24)
                 next_48h_end = now + datetime.timedelta(hours=48)
+
+                # compare slot start epochs instead of parsing every timestamp
+                now_ts = now.timestamp()
+                today_start_ts = today_start.timestamp()
+                tomorrow_start_ts = tomorrow_start.timestamp()
+                tomorrow_end_ts = tomorrow_end.timestamp()
+                next_24h_end_ts = next_24h_end.timestamp()
+                next_48h_end_ts = next_48h_end.timestamp()
                 
-                # Sort all price entries by timestamp
-                all_entries: list[tuple[datetime.datetime, str]] = []
-                for startsAt, entry in (getattr(self._tibber_home, "_price_info", {}) or {}).items():
-                    ts = entry.get("timestamp")
-                    if not isinstance(ts, datetime.datetime):
-                        continue
-                    all_entries.append((ts, startsAt))
-                all_entries.sort()
-                
-                # Collect prices and calculate stats
-                today_prices: list[float] = []
-                tomorrow_prices: list[float] = []
-                
-                for ts, startsAt in all_entries:
-                    entry = self._tibber_home._price_info.get(startsAt, {})
+                # the price timeline is already sorted by start time
+                for slot in self._tibber_home.price_timeline.slots:
+                    ts = slot.start
                     price_data = {
-                        "startsAt": startsAt,
-                        "total": entry.get("total"),
-                        "energy": entry.get("energy"),
-                        "tax": entry.get("tax"),
-                        "level": self._tibber_home.price_level.get(startsAt),
+                        "startsAt": slot.starts_at,
+                        "total": slot.total,
+                        "energy": slot.energy,
+                        "tax": slot.tax,
+                        "level": slot.level,
                     }
                     
                     # Today entries
-                    if today_start <= ts < tomorrow_start:
+                    if today_start_ts <= ts < tomorrow_start_ts:
                         today_all.append(price_data)
-                        if entry.get("total") is not None:
-                            today_prices.append(entry.get("total"))
                     
                     # Tomorrow entries
-                    elif tomorrow_start <= ts < tomorrow_end:
+                    elif tomorrow_start_ts <= ts < tomorrow_end_ts:
                         tomorrow_all.append(price_data)
-                        if entry.get("total") is not None:
-                            tomorrow_prices.append(entry.get("total"))
                     
                     # Next 24h (rolling window from now)
-                    if now <= ts < next_24h_end:
+                    if now_ts <= ts < next_24h_end_ts:
                         next_24h.append(price_data)
                     
                     # Next 48h (rolling window from now)
-                    if now <= ts < next_48h_end:
+                    if now_ts <= ts < next_48h_end_ts:
                         next_48h.append(price_data)
                 
-                # Add statistics
+                # Add statistics (precomputed per day by the Tibber home)
                 stats: dict[str, Any] = {}
-                if today_prices:
-                    stats["today_min"] = round(min(today_prices), 5)
-                    stats["today_max"] = round(max(today_prices), 5)
-                    stats["today_avg"] = round(sum(today_prices) / len(today_prices), 5)
+                if self._tibber_home.electricity_price_today_min is not None:
+                    stats["today_min"] = round(self._tibber_home.electricity_price_today_min, 5)
+                    stats["today_max"] = round(self._tibber_home.electricity_price_today_max, 5)
+                    stats["today_avg"] = round(self._tibber_home.electricity_price_today_avg, 5)
                 
-                if tomorrow_prices:
-                    stats["tomorrow_min"] = round(min(tomorrow_prices), 5)
-                    stats["tomorrow_max"] = round(max(tomorrow_prices), 5)
-                    stats["tomorrow_avg"] = round(sum(tomorrow_prices) / len(tomorrow_prices), 5)
+                if self._tibber_home.electricity_price_tomorrow_min is not None:
+                    stats["tomorrow_min"] = round(self._tibber_home.electricity_price_tomorrow_min, 5)
+                    stats["tomorrow_max"] = round(self._tibber_home.electricity_price_tomorrow_max, 5)
+                    stats["tomorrow_avg"] = round(self._tibber_home.electricity_price_tomorrow_avg, 5)
                     stats["tomorrow_available"] = True
                 else:
                     stats["tomorrow_available"] = False
@@ -909,7 +1004,19 @@ class TibberDataSensor(TibberSensor, CoordinatorEntity["TibberDataCoordinator"])
                 **(self._attr_extra_state_attributes or {}),
                 "price_info_summary": summary,
             }
-        
+
+        # Tijdens een API storing blijven de laatst opgehaalde gegevens zichtbaar,
+        # gemarkeerd als stale met het moment van de laatste prijsupdate
+        attributes = {
+            key: value
+            for key, value in (self._attr_extra_state_attributes or {}).items()
+            if key not in ("stale", "last_price_update")
+        }
+        if self._tibber_home.stale:
+            attributes["stale"] = True
+            attributes["last_price_update"] = self._tibber_home.last_price_update
+        self._attr_extra_state_attributes = attributes or None
+
         self.async_write_ha_state()
 
 class TibberSensorRT(TibberSensor, CoordinatorEntity["TibberRtDataCoordinator"]):
@@ -918,13 +1025,16 @@ class TibberSensorRT(TibberSensor, CoordinatorEntity["TibberRtDataCoordinator"])
     def __init__(
         self,
         tibber_home: tibber.TibberHome,
-        description: SensorEntityDescription,
+        description: TibberRtSensorEntityDescription,
         initial_state: float,
         coordinator: TibberRtDataCoordinator,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator=coordinator, tibber_home=tibber_home)
-        self.entity_description = description
+        self.entity_description: TibberRtSensorEntityDescription = description
+        # moment en beschikbaarheid van de laatst geschreven state
+        self._last_write = time.monotonic()
+        self._written_available = True
         self._model = "Tibber Pulse"
         self._device_name = f"{self._model} {self._home_name}"
 
@@ -1002,9 +1112,29 @@ class TibberSensorRT(TibberSensor, CoordinatorEntity["TibberRtDataCoordinator"])
                     )
         if self.entity_description.key == "powerFactor":
             state *= 100.0
+        available = self.available
+        if available == self._written_available and not self._should_write(state):
+            self.coordinator.count_state_write(self.entity_description.key, False)
+            return
         self._attr_native_value = state
+        self._last_write = time.monotonic()
+        self._written_available = available
+        self.coordinator.count_state_write(self.entity_description.key, True)
         self.async_write_ha_state()
 
+    def _should_write(self, state: float) -> bool:
+        """Return True if the write policy of the sensor lets the new state through."""
+        last = self.native_value
+        if state == last:
+            return False
+        description = self.entity_description
+        if description.write_on_change or not isinstance(last, (int, float)):
+            return True
+        if time.monotonic() - self._last_write < description.min_interval:
+            return False
+        deadband = max(description.deadband, description.relative_deadband * abs(last))
+        return abs(state - last) > deadband
+
 
 class TibberRtDataCoordinator(DataUpdateCoordinator):  # pylint: disable=hass-enforce-coordinator-module
     """Handle Tibber realtime data."""
@@ -1020,6 +1150,9 @@ class TibberRtDataCoordinator(DataUpdateCoordinator):  # pylint: disable=hass-en
         self._tibber_home = tibber_home
         self.hass = hass
         self._added_sensors: set[str] = set()
+        # geschreven en onderdrukte state updates per sensor
+        self.state_writes: dict[str, int] = {}
+        self.suppressed_state_writes: dict[str, int] = {}
         super().__init__(
             hass,
             _LOGGER,
@@ -1108,6 +1241,11 @@ class TibberRtDataCoordinator(DataUpdateCoordinator):  # pylint: disable=hass-en
         if new_entities:
             self._async_add_entities(new_entities)
 
+    def count_state_write(self, key: str, written: bool) -> None:
+        """Count a written or suppressed state update of a sensor."""
+        counts = self.state_writes if written else self.suppressed_state_writes
+        counts[key] = counts.get(key, 0) + 1
+
     def get_live_measurement(self) -> Any:
         """Get live measurement data."""
         if errors := self.data.get("errors"):
@@ -0,0 +1,87 @@
+"""Services for the Tibber integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .tibber import Tibber
+
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+
+ATTR_CONTIGUOUS = "contiguous"
+ATTR_DEADLINE = "deadline"
+ATTR_DURATION = "duration"
+ATTR_EARLIEST = "earliest"
+ATTR_HOME_ID = "home_id"
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DURATION): cv.positive_time_period,
+        vol.Optional(ATTR_EARLIEST): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_CONTIGUOUS, default=True): cv.boolean,
+        vol.Optional(ATTR_HOME_ID): cv.string,
+    }
+)
+
+
+def _as_aware(value: Any) -> Any:
+    """Interpret naive datetimes from the service call in local time."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value
+
+
+async def _async_find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+    """Find the cheapest window for every active home."""
+    tibber_connection: Tibber = call.hass.data[DOMAIN]
+    homes = tibber_connection.get_homes(only_active=True)
+    if home_id := call.data.get(ATTR_HOME_ID):
+        homes = [home for home in homes if home.home_id == home_id]
+        if not homes:
+            raise ServiceValidationError(f"Unknown Tibber home: {home_id}")
+
+    response: dict[str, Any] = {}
+    for home in homes:
+        window = home.find_cheapest_window(
+            call.data[ATTR_DURATION],
+            earliest=_as_aware(call.data.get(ATTR_EARLIEST)),
+            deadline=_as_aware(call.data.get(ATTR_DEADLINE)),
+            contiguous=call.data[ATTR_CONTIGUOUS],
+        )
+        if window is None:
+            response[home.home_id] = None
+            continue
+        response[home.home_id] = {
+            "start": window.start.isoformat(),
+            "end": window.end.isoformat(),
+            "average_price": round(window.average, 5),
+            "slots": [
+                {"startsAt": slot.starts_at, "total": slot.total}
+                for slot in window.slots
+            ],
+        }
+    return {"homes": response}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Tibber services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        _async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -2,23 +2,49 @@
 
 import asyncio
 import datetime as dt
+import json
 import logging
+import time
 import zoneinfo
+from http import HTTPStatus
 from typing import Any
 
 import aiohttp
 
-from .const import API_ENDPOINT, DEFAULT_TIMEOUT, DEMO_TOKEN, __version__
+from .archive import HourlyArchive
+from .cache import ResponseCache
+from .const import (
+    API_ENDPOINT,
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_RESET_TIMEOUT,
+    CIRCUIT_OPEN,
+    CIRCUIT_RESET_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    DEMO_TOKEN,
+    HOME_INFO_MAX_AGE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    RT_POWER_WINDOW,
+    __version__,
+)
 from .exceptions import (
+    CircuitOpenError,
     FatalHttpExceptionError,
+    HttpExceptionError,
     InvalidLoginError,
     RetryableHttpExceptionError,
     UserAgentMissingError,
 )
-from .gql_queries import INFO, PUSH_NOTIFICATION
+from .gql_queries import INFO, PUSH_NOTIFICATION, batch_homes, document_hash, operation_name
 from .home import TibberHome
+from .metrics import ApiMetrics, QueryMetrics
 from .realtime import TibberRT
-from .response_handler import extract_response_data
+from .response_handler import ACCEPT_ENCODING, extract_response_data
+from .decoder import JSON_DECODE_ERRORS
+from .scheduler import CircuitBreaker, RequestScheduler, backoff_delay
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,7 +63,12 @@ class Tibber:
         tax_rate: float = 0,
         electricity_energy_tax_incl_btw: float = 0.1228,  # Energiebelasting incl BTW
         purchasing_compensation: float = 0.0205,  # Inkoopvergoeding per kWh
-        
+        archive_path: str | None = None,
+        cache_path: str | None = None,
+        request_rate: float = REQUEST_RATE,
+        request_burst: int = REQUEST_BURST,
+        rt_power_window: float = RT_POWER_WINDOW,
+        native_live_feed: bool = False,
     ):
         """Initialize the Tibber connection.
 
@@ -49,6 +80,13 @@ class Tibber:
         :param tax_rate: BTW percentage (default: 0)
         :param electricity_energy_tax_incl_btw: Energiebelasting incl BTW (default: 0.1228)
         :param purchasing_compensation: Inkoopvergoeding per kWh (default: 0.0205)
+        :param archive_path: Path of the SQLite archive of hourly data, None to not archive.
+        :param cache_path: Path of the file to persist cached responses in, None to not persist.
+        :param request_rate: The number of API requests per second in the long run.
+        :param request_burst: The number of API requests that can be sent at once.
+        :param rt_power_window: The seconds of live power averaged for the estimated hour consumption.
+        :param native_live_feed: Receive live measurements with the minimal graphql-transport-ws client of
+            live_feed instead of the gql Client, decoded into LiveMeasurement records.
         """
 
         if websession is None:
@@ -73,6 +111,8 @@ class Tibber:
             self._access_token,
             self.timeout,
             self._user_agent,
+            self.update_info,
+            native_live_feed,
         )
 
         self.time_zone: dt.tzinfo = time_zone or zoneinfo.ZoneInfo("UTC")
@@ -81,6 +121,16 @@ class Tibber:
         self._active_home_ids: list[str] = []
         self._all_home_ids: list[str] = []
         self._homes: dict[str, TibberHome] = {}
+        self._in_flight: dict[str, asyncio.Task[dict[Any, Any] | None]] = {}
+        self._response_cache = ResponseCache(cache_path)
+        self._scheduler = RequestScheduler(request_rate, request_burst)
+        self._breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, CIRCUIT_MAX_RESET_TIMEOUT)
+        self.request_count: int = 0
+        self.coalesced_request_count: int = 0
+        self.cached_request_count: int = 0
+        self.metrics = ApiMetrics()
+        self.rt_power_window: float = rt_power_window
+        self.archive: HourlyArchive | None = HourlyArchive(archive_path) if archive_path else None
 
     async def close_connection(self) -> None:
         """Close the Tibber connection.
@@ -93,91 +143,181 @@ class Tibber:
         variable_values: dict[Any, Any] | None = None,
         timeout: int | None = None,
         retry: int = 3,
+        max_age: float | None = None,
+        priority: int = PRIORITY_NORMAL,
     ) -> dict[Any, Any] | None:
         """Execute a GraphQL query and return the data.
 
+        Requests are keyed by the hash of the document and the variables.
+        Concurrent calls with the same key share one request and get the same
+        data, which must not be modified. Mutations are always sent.
+
         :param document: The GraphQL query to request.
         :param variable_values: The GraphQL variables to parse with the request.
         :param timeout: The timeout to use for the request.
         :param retry: The number of times to retry the request.
+        :param max_age: Return the cached data of an earlier request if it is
+            at most this many seconds old, and cache the new data. None to not cache.
+        :param priority: The priority of the request when requests are throttled.
+        """
+        metrics = self.metrics.query(operation_name(document))
+        if document.lstrip().startswith("mutation"):
+            self.request_count += 1
+            return await self._execute(document, variable_values, timeout, retry, priority, metrics)
+
+        key = f"{document_hash(document)}:{json.dumps(variable_values or {}, sort_keys=True, default=str)}"
+        if max_age is not None:
+            await self._response_cache.async_load()
+            if (data := self._response_cache.get(key, max_age)) is not None:
+                self.cached_request_count += 1
+                metrics.cache_hits += 1
+                return data
+
+        if (task := self._in_flight.get(key)) is None:
+            self.request_count += 1
+            task = asyncio.ensure_future(
+                self._execute(document, variable_values, timeout, retry, priority, metrics)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced_request_count += 1
+            metrics.coalesced += 1
+        data = await asyncio.shield(task)
+
+        if max_age is not None and data:
+            self._response_cache.set(key, data)
+            await self._response_cache.async_save()
+        return data
+
+    async def _execute(
+        self,
+        document: str,
+        variable_values: dict[Any, Any] | None = None,
+        timeout: int | None = None,
+        retry: int = 3,
+        priority: int = PRIORITY_NORMAL,
+        metrics: QueryMetrics | None = None,
+    ) -> dict[Any, Any] | None:
+        """Send a GraphQL request, with retries, and return the data.
+
+        Every attempt waits for a slot of the request scheduler. A failed
+        attempt is retried after an exponential backoff with jitter, or after
+        the Retry-After time of the response if that is longer. After a 429
+        response all requests are held back for that time. While the circuit
+        breaker is open, CircuitOpenError is raised without sending anything.
+        Every attempt is counted in the metrics of the operation.
         """
         timeout = timeout or self.timeout
+        metrics = metrics or self.metrics.query(operation_name(document))
 
-        payload = {"query": document, "variables": variable_values or {}}
+        body = json.dumps({"query": document, "variables": variable_values or {}}, separators=(",", ":")).encode()
 
         post_args = {
             "headers": {
                 "Authorization": "Bearer " + self._access_token,
                 aiohttp.hdrs.USER_AGENT: self._user_agent,
+                aiohttp.hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING,
+                aiohttp.hdrs.CONTENT_TYPE: "application/json",
             },
-            "data": payload,
+            "data": body,
         }
+        # in half-open toestand is dit request de probe, die moet bij elk einde vrijkomen
+        if (ticket := self._breaker.allow()) is None:
+            raise CircuitOpenError("Tibber API is unavailable, request not sent")
         try:
-            resp = await self.websession.post(API_ENDPOINT, **post_args, timeout=self.timeout)
-            return (await extract_response_data(resp)).get("data")
-        except (TimeoutError, aiohttp.ClientError) as err:
-            if retry > 0:
-                return await self.execute(
-                    document,
-                    variable_values,
-                    timeout,
-                    retry - 1,
-                )
-            if isinstance(err, asyncio.TimeoutError):
-                _LOGGER.error("Timed out when connecting to Tibber")
-            else:
-                _LOGGER.exception("Error connecting to Tibber")
-            raise
-        except (InvalidLoginError, FatalHttpExceptionError) as err:
-            # 504 Gateway Timeout en 502/503 zijn tijdelijke server problemen
-            if hasattr(err, 'status') and err.status in (502, 503, 504):
-                if retry > 0:
+            attempt = 0
+            while True:
+                await self._scheduler.acquire(priority)
+                retry_after: float | None = None
+                metrics.requests += 1
+                metrics.bytes_out += len(body)
+                started = time.monotonic()
+                try:
+                    resp = await self.websession.post(API_ENDPOINT, **post_args, timeout=timeout)
+                    data = (await extract_response_data(resp)).get("data")
+                    # de body is al gelezen, read() geeft hem opnieuw zonder I/O
+                    metrics.bytes_in += resp.content_length or len(await resp.read())
+                except JSON_DECODE_ERRORS as err:
+                    # een 200 met een body die geen JSON is telt als storing
+                    metrics.latency.observe(time.monotonic() - started)
+                    metrics.errors += 1
+                    self._breaker.record_failure(ticket)
+                    _LOGGER.error("Ongeldig antwoord van Tibber API: %s", err)
+                    raise
+                except (TimeoutError, aiohttp.ClientError) as err:
+                    metrics.latency.observe(time.monotonic() - started)
+                    metrics.errors += 1
+                    if attempt >= retry:
+                        self._breaker.record_failure(ticket)
+                        if isinstance(err, asyncio.TimeoutError):
+                            _LOGGER.error("Timed out when connecting to Tibber")
+                        else:
+                            _LOGGER.exception("Error connecting to Tibber")
+                        raise
+                    metrics.add_retry(type(err).__name__)
+                except (InvalidLoginError, FatalHttpExceptionError) as err:
+                    metrics.latency.observe(time.monotonic() - started)
+                    metrics.errors += 1
+                    # 504 Gateway Timeout en 502/503 zijn tijdelijke server problemen
+                    if err.status not in (502, 503, 504):
+                        # de API antwoordt wel, dus dit telt niet als storing
+                        self._breaker.record_success(ticket)
+                        _LOGGER.error(
+                            "Fatale fout bij Tibber API communicatie, HTTP status: %s. API error: %s / %s",
+                            err.status,
+                            err.extension_code,
+                            err.message,
+                        )
+                        raise
+                    if attempt >= retry:
+                        self._breaker.record_failure(ticket)
+                        _LOGGER.warning(
+                            "Tibber API server timeout (%s), alle pogingen gefaald",
+                            err.status
+                        )
+                        raise
                     _LOGGER.warning(
                         "Tibber API server probleem (%s), opnieuw proberen (%s pogingen over)",
-                        err.status, retry
-                    )
-                    await asyncio.sleep(2)  # Korte vertraging voor server recovery
-                    return await self.execute(
-                        document,
-                        variable_values,
-                        timeout,
-                        retry - 1,
+                        err.status, retry - attempt
                     )
-                else:
+                    retry_after = err.retry_after
+                    metrics.add_retry(str(err.status))
+                except RetryableHttpExceptionError as err:
+                    metrics.latency.observe(time.monotonic() - started)
+                    metrics.errors += 1
+                    if attempt >= retry:
+                        self._breaker.record_failure(ticket)
+                        _LOGGER.warning(
+                            "Tijdelijke Tibber API fout na alle pogingen, HTTP status: %s. API error: %s / %s",
+                            err.status,
+                            err.extension_code,
+                            err.message,
+                        )
+                        raise
                     _LOGGER.warning(
-                        "Tibber API server timeout (%s), alle pogingen gefaald",
-                        err.status
+                        "Tijdelijke Tibber API fout (HTTP %s), opnieuw proberen (%s pogingen over): %s",
+                        err.status,
+                        retry - attempt,
+                        err.message,
                     )
-            else:
-                _LOGGER.error(
-                    "Fatale fout bij Tibber API communicatie, HTTP status: %s. API error: %s / %s",
-                    getattr(err, 'status', 'unknown'),
-                    getattr(err, 'extension_code', 'unknown'),
-                    getattr(err, 'message', str(err)),
-                )
-            raise
-        except RetryableHttpExceptionError as err:
-            if retry > 0:
-                _LOGGER.warning(
-                    "Tijdelijke Tibber API fout (HTTP %s), opnieuw proberen (%s pogingen over): %s",
-                    err.status,
-                    retry,
-                    err.message,
-                )
-                await asyncio.sleep(2)  # Korte vertraging
-                return await self.execute(
-                    document,
-                    variable_values,
-                    timeout,
-                    retry - 1,
-                )
-            _LOGGER.warning(
-                "Tijdelijke Tibber API fout na alle pogingen, HTTP status: %s. API error: %s / %s",
-                err.status,
-                err.extension_code,
-                err.message,
-            )
-            raise
+                    retry_after = err.retry_after
+                    metrics.add_retry(str(err.status))
+                    if err.status == HTTPStatus.TOO_MANY_REQUESTS:
+                        # Ook andere requests wachten, anders volgt de ene 429 op de andere
+                        self._scheduler.pause(retry_after if retry_after is not None else backoff_delay(attempt))
+                else:
+                    metrics.latency.observe(time.monotonic() - started)
+                    self._breaker.record_success(ticket)
+                    return data
+
+                if self._breaker.state == CIRCUIT_OPEN:
+                    # andere requests faalden ook, dus niet blijven proberen
+                    raise CircuitOpenError("Tibber API is unavailable, request not retried")
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+                attempt += 1
+        finally:
+            self._breaker.release_probe(ticket)
 
     async def update_info(self) -> None:
         """Updates home info asynchronously."""
@@ -231,10 +371,9 @@ class Tibber:
         """
         if not (
             res := await self.execute(
-                PUSH_NOTIFICATION.format(
-                    title,
-                    message,
-                )
+                PUSH_NOTIFICATION,
+                {"title": title, "message": message},
+                priority=PRIORITY_INTERACTIVE,
             )
         ):
             return False
@@ -258,6 +397,84 @@ class Tibber:
         """Fetch production data for active homes."""
         await asyncio.gather(*[tibber_home.fetch_production_data() for tibber_home in self.get_homes(only_active=True)])
 
+    @property
+    def api_available(self) -> bool:
+        """Return False while requests are held back because the API keeps failing."""
+        return self._breaker.state == CIRCUIT_CLOSED
+
+    async def update_active_homes(self) -> None:
+        """Update price info and hourly data of all active homes in one request.
+
+        Every home is an aliased field (h0, h1, ...) of one document, with its
+        price info and the hourly consumption and production it still needs,
+        and the response is fanned out to the homes. The document only
+        depends on the number of homes, the rest are variables. The home
+        info is cached. Every step is timed as an update phase.
+
+        When the batched request fails, or a home is missing in its response,
+        those homes are updated with their own requests, so one failing home
+        does not keep the other homes from updating.
+        """
+        homes = self.get_homes(only_active=True)
+        if not homes:
+            return
+        with self.metrics.phase("home_info"):
+            await asyncio.gather(*[home.update_info(max_age=HOME_INFO_MAX_AGE) for home in homes])
+        with self.metrics.phase("hours_to_fetch"):
+            variables = {
+                f"{name}{index}": value
+                for index, home_variables in enumerate(
+                    await asyncio.gather(*[home.batch_update_variables() for home in homes])
+                )
+                for name, value in home_variables.items()
+            }
+        with self.metrics.phase("batch_request"):
+            try:
+                data = await self.execute(
+                    batch_homes(len(homes)), variables, timeout=30, priority=PRIORITY_INTERACTIVE
+                )
+            except InvalidLoginError:
+                raise
+            except (HttpExceptionError, TimeoutError, aiohttp.ClientError) as err:
+                _LOGGER.warning("Batched update of the homes failed, updating them one by one: %s", err)
+                data = None
+        viewer = (data or {}).get("viewer") or {}
+        failed_homes = []
+        with self.metrics.phase("process_homes"):
+            for index, home in enumerate(homes):
+                if (home_data := viewer.get(f"h{index}")) is None:
+                    failed_homes.append(home)
+                    continue
+                await home.process_batch_update(home_data)
+        if failed_homes:
+            with self.metrics.phase("home_fallback"):
+                await self._update_homes_separately(failed_homes)
+
+    async def _update_homes_separately(self, homes: list[TibberHome]) -> None:
+        """Update price info and hourly data of homes with a request per home.
+
+        Raises the first error when no home could be updated.
+
+        :param homes: The homes to update.
+        """
+        results = await asyncio.gather(
+            *[self._update_home_separately(home) for home in homes], return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for home, result in zip(homes, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("Could not update home %s: %s", home.home_id, result)
+        if len(errors) == len(homes):
+            raise errors[0]
+
+    @staticmethod
+    async def _update_home_separately(home: TibberHome) -> None:
+        """Update price info and hourly data of one home with its own requests."""
+        await home.update_info_and_price_info()
+        await home.fetch_consumption_data()
+        if home.has_production:
+            await home.fetch_production_data()
+
     async def rt_disconnect(self) -> None:
         """Stop subscription manager.
         This method simply calls the stop method of the SubscriptionManager if it is defined.
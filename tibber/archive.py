@@ -0,0 +1,77 @@
+"""On-disk archive of hourly consumption and production data."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable, Mapping
+from contextlib import closing
+from typing import Any
+
+from .decoder import json_loads
+
+
+class HourlyArchive:
+    """Archive of hourly nodes per home in a SQLite database.
+
+    Nodes are keyed by home, direction and the start epoch of the hour, so
+    corrected hours replace the archived ones. All methods block on disk I/O,
+    run them in an executor.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the archive.
+
+        :param path: The path of the SQLite database, created when missing.
+        """
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hourly ("
+            " home_id TEXT NOT NULL,"
+            " production INTEGER NOT NULL,"
+            " start INTEGER NOT NULL,"
+            " node TEXT NOT NULL,"
+            " PRIMARY KEY (home_id, production, start)"
+            ") WITHOUT ROWID"
+        )
+        return conn
+
+    def load(self, home_id: str, production: bool, since: float) -> list[dict[str, Any]]:
+        """Return the archived nodes starting at or after a moment, in time order.
+
+        :param home_id: The id of the home.
+        :param production: True for production data, False for consumption.
+        :param since: The POSIX timestamp of the oldest hour to load.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT node FROM hourly WHERE home_id = ? AND production = ? AND start >= ? ORDER BY start",
+                (home_id, production, int(since)),
+            ).fetchall()
+        return [json_loads(node) for (node,) in rows]
+
+    def store(
+        self,
+        home_id: str,
+        production: bool,
+        nodes: Iterable[tuple[int, Mapping[str, Any]]],
+        keep_since: float,
+    ) -> None:
+        """Insert or replace nodes and remove hours older than the retention.
+
+        :param home_id: The id of the home.
+        :param production: True for production data, False for consumption.
+        :param nodes: (start epoch, node) pairs to store.
+        :param keep_since: The POSIX timestamp of the oldest hour to keep.
+        """
+        rows = [(home_id, production, key, json.dumps(dict(node), separators=(",", ":"))) for key, node in nodes]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO hourly VALUES (?, ?, ?, ?)", rows)
+            conn.execute(
+                "DELETE FROM hourly WHERE home_id = ? AND production = ? AND start < ?",
+                (home_id, production, int(keep_since)),
+            )
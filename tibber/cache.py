@@ -0,0 +1,95 @@
+"""Cache of GraphQL responses that rarely change."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from .const import CACHE_PRIVATE_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Cache of GraphQL response data with a maximum age per lookup.
+
+    Entries are kept with the time they were fetched. When a path is given,
+    the cache is loaded from and saved to a JSON file, so cached responses
+    survive a restart. Fields with personal data are only kept in memory,
+    they are left out of the file.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Initialize the cache.
+
+        :param path: The path of the JSON file to persist the cache in, None to keep it in memory.
+        """
+        self.path = path
+        self._entries: dict[str, tuple[float, dict[Any, Any]]] = {}
+        self._loaded = path is None
+
+    def get(self, key: str, max_age: float) -> dict[Any, Any] | None:
+        """Return the cached data if it is not older than max_age seconds."""
+        if (entry := self._entries.get(key)) is None or time.time() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def set(self, key: str, data: dict[Any, Any]) -> None:
+        """Store the data for a key."""
+        self._entries[key] = (time.time(), data)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries = {}
+
+    async def async_load(self) -> None:
+        """Load the cache from disk, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Could not load the response cache: %s", err)
+            return
+        for key, (fetched, data) in entries.items():
+            self._entries.setdefault(key, (fetched, data))
+
+    async def async_save(self) -> None:
+        """Save the cache to disk."""
+        if self.path is None:
+            return
+        entries = {key: (fetched, _without_private(data)) for key, (fetched, data) in self._entries.items()}
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, entries)
+        except OSError as err:
+            _LOGGER.warning("Could not save the response cache: %s", err)
+
+    def _read(self) -> dict[str, tuple[float, dict[Any, Any]]]:
+        """Read the entries from the file."""
+        assert self.path is not None
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as file:
+            return {key: (fetched, data) for key, (fetched, data) in json.load(file).items()}
+
+    def _write(self, entries: dict[str, tuple[float, dict[Any, Any]]]) -> None:
+        """Write the entries to the file, replacing it atomically."""
+        assert self.path is not None
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entries, file, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def _without_private(data: Any) -> Any:
+    """Return a copy of the data without the fields with personal data."""
+    if isinstance(data, dict):
+        return {key: _without_private(value) for key, value in data.items() if key not in CACHE_PRIVATE_FIELDS}
+    if isinstance(data, list):
+        return [_without_private(value) for value in data]
+    return data
@@ -9,12 +9,68 @@ API_ENDPOINT: Final = "https://api.tibber.com/v1-beta/gql"
 DEFAULT_TIMEOUT: Final = 10
 DEMO_TOKEN: Final = "5K4MVS-OjfWhK_4yrjOlFe1F6kJXPVf7eQYggo8ebAE"
 
+# Client-side request budget: sustained requests per second and burst size
+REQUEST_RATE: Final = 100 / 300
+REQUEST_BURST: Final = 10
+
+# Exponential backoff of retried requests, in seconds
+BACKOFF_BASE: Final = 1.0
+BACKOFF_MAX: Final = 60.0
+
+# Circuit breaker: failed requests in a row that open it, and the seconds
+# before the first and at most between probe requests
+CIRCUIT_FAILURE_THRESHOLD: Final = 3
+CIRCUIT_RESET_TIMEOUT: Final = 60.0
+CIRCUIT_MAX_RESET_TIMEOUT: Final = 15 * 60.0
+CIRCUIT_CLOSED: Final = "closed"
+CIRCUIT_OPEN: Final = "open"
+CIRCUIT_HALF_OPEN: Final = "half_open"
+
+# Seconds after which price data that could not be refreshed is stale
+PRICE_STALE_AFTER: Final = 2 * 60 * 60
+
+# Upper bounds in seconds of the latency histogram buckets of requests and update phases
+LATENCY_BUCKETS: Final = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Seconds of live power measurements averaged for the estimated hour consumption
+RT_POWER_WINDOW: Final = 5 * 60
+
+# Seconds without live measurements before the realtime subscription of a home is considered dead
+RT_DATA_TIMEOUT: Final = 60
+
+# Seconds a realtime subscription waits for the websocket connection to be acknowledged
+RT_CONNECT_TIMEOUT: Final = 30
+
+# Websocket subprotocol of the native live feed client
+LIVE_FEED_SUBPROTOCOL: Final = "graphql-transport-ws"
+
+# Live measurements kept per home for a lagging consumer, older ones are dropped
+RT_MAILBOX_SIZE: Final = 1
+
+# Request priorities, lower values are sent first when throttled
+PRIORITY_INTERACTIVE: Final = 0
+PRIORITY_NORMAL: Final = 1
+PRIORITY_BULK: Final = 2
+
 RESOLUTION_HOURLY: Final = "HOURLY"
 RESOLUTION_DAILY: Final = "DAILY"
 RESOLUTION_WEEKLY: Final = "WEEKLY"
 RESOLUTION_MONTHLY: Final = "MONTHLY"
 RESOLUTION_ANNUAL: Final = "ANNUAL"
 
+# Maximum age in seconds of cached home info (address, owner, metering point)
+HOME_INFO_MAX_AGE: Final = 24 * 60 * 60
+
+# Fields of cached responses with personal data (owner name and contact info), not written to disk
+CACHE_PRIVATE_FIELDS: Final = frozenset({"owner"})
+
+# Number of nodes requested per page when paging through historic data
+HISTORIC_PAGE_SIZE: Final = 744
+
+# Hour windows (first hour, last hour) of the day used for price ranks
+PRICE_RANK_DAY: Final = (0, 23)
+PRICE_RANK_WINDOWS: Final = (PRICE_RANK_DAY, (0, 7), (8, 17), (18, 23))
+
 API_ERR_CODE_UNKNOWN: Final = "UNKNOWN"
 API_ERR_CODE_UNAUTH: Final = "UNAUTHENTICATED"
 HTTP_CODES_RETRIABLE: Final = [
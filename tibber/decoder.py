@@ -0,0 +1,35 @@
+"""JSON decoding of Tibber API responses."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+def _select_decoder() -> tuple[str, Callable[[bytes | str], Any]]:
+    """Return the name and loads function of the fastest available decoder."""
+    if orjson is not None:
+        return "orjson", orjson.loads
+    if msgspec is not None:
+        return "msgspec", msgspec.json.Decoder().decode
+    return "json", json.loads
+
+
+# orjson or msgspec when installed, otherwise the standard library
+JSON_DECODER, json_loads = _select_decoder()
+
+# errors json_loads raises on a body that is not valid JSON
+JSON_DECODE_ERRORS: tuple[type[Exception], ...] = (
+    (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+)
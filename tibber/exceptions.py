@@ -11,12 +11,21 @@ class UserAgentMissingError(Exception):
     """Exception raised when user agent is missing"""
 
 
+class LiveFeedError(Exception):
+    """Exception raised when the live feed server sends an error or an unexpected message"""
+
+
+class CircuitOpenError(Exception):
+    """Exception raised when a request is not sent because the API keeps failing"""
+
+
 class HttpExceptionError(Exception):
     """Exception base for HTTP errors
 
     :param status: http response code
     :param message: http response message if any
     :param extension_code: http response extension if any
+    :param retry_after: seconds to wait before retrying, from the Retry-After header if any
     """
 
     def __init__(
@@ -24,10 +33,12 @@ class HttpExceptionError(Exception):
         status: int,
         message: str = "HTTP error",
         extension_code: str = API_ERR_CODE_UNKNOWN,
+        retry_after: float | None = None,
     ):
         self.status = status
         self.message = message
         self.extension_code = extension_code
+        self.retry_after = retry_after
         super().__init__(self.message)
 
 
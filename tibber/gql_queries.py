@@ -1,45 +1,118 @@
 """Gql queries"""
 
-HISTORIC_DATA = """
-                {{
-                  viewer {{
-                    home(id: "{0}") {{
-                      {1}(resolution: {2}, last: {3}, before: "{5}") {{
-                        pageInfo {{
+import functools
+import hashlib
+import re
+
+# Strings, str.format() velden en %s blijven hele tokens
+_TOKENS = re.compile(r'"[^"]*"|\{\{|\}\}|\{\d*\}|%s|[_0-9A-Za-z]+|\S')
+_OPERATION = re.compile(r"\s*(query|mutation|subscription)\s*([_A-Za-z][_0-9A-Za-z]*)?")
+
+
+def _is_word(token: str) -> bool:
+    """Return True for names, values and template fields, False for punctuation."""
+    return token not in ("{{", "}}") and (len(token) > 1 or token.isalnum() or token == "_")
+
+
+def minify(document: str) -> str:
+    """Return a GraphQL document without indentation and needless whitespace.
+
+    Whitespace is only kept, as a single space, between two names or
+    values, so the result can still be filled in with % or str.format().
+
+    :param document: The GraphQL document or document template.
+    """
+    result: list[str] = []
+    previous_word = False
+    previous_end = 0
+    for match in _TOKENS.finditer(document):
+        token = match.group()
+        word = _is_word(token)
+        if word and previous_word and match.start() > previous_end:
+            result.append(" ")
+        result.append(token)
+        previous_word = word
+        previous_end = match.end()
+    return "".join(result)
+
+
+HISTORIC_DATA = minify("""
+                query HistoricData(
+                  $homeId: ID!
+                  $resolution: EnergyResolution!
+                  $last: Int
+                  $before: String
+                  $first: Int
+                  $after: String
+                  $production: Boolean!
+                ) {
+                  viewer {
+                    home(id: $homeId) {
+                      consumption(resolution: $resolution, last: $last, before: $before, first: $first, after: $after) @skip(if: $production) {
+                        pageInfo {
                           hasPreviousPage
                           startCursor
-                        }}
-                        nodes {{
+                          hasNextPage
+                          endCursor
+                        }
+                        nodes {
                           from
                           unitPrice
-                          {4}
-                          {1}
-                        }}
-                      }}
-                    }}
-                  }}
-                }}
-          """
-HISTORIC_PRICE = """
-                {{
-                  viewer {{
-                    home(id: "{0}") {{
-                      currentSubscription {{
-                        priceRating {{
-                            {1} {{
-                              entries {{
-                                  time
-                                  total
-                              }}
-                            }}
-                         }}
-                     }}
-                  }}
-                  }}
-                }}
-          """
-INFO = """
-        {
+                          totalCost
+                          cost
+                          consumption
+                        }
+                      }
+                      production(resolution: $resolution, last: $last, before: $before, first: $first, after: $after) @include(if: $production) {
+                        pageInfo {
+                          hasPreviousPage
+                          startCursor
+                          hasNextPage
+                          endCursor
+                        }
+                        nodes {
+                          from
+                          unitPrice
+                          profit
+                          production
+                        }
+                      }
+                    }
+                  }
+                }
+          """)
+HISTORIC_PRICE = minify("""
+                query HistoricPrice($homeId: ID!, $hourly: Boolean!, $daily: Boolean!, $monthly: Boolean!) {
+                  viewer {
+                    home(id: $homeId) {
+                      currentSubscription {
+                        priceRating {
+                          hourly @include(if: $hourly) {
+                            entries {
+                              time
+                              total
+                            }
+                          }
+                          daily @include(if: $daily) {
+                            entries {
+                              time
+                              total
+                            }
+                          }
+                          monthly @include(if: $monthly) {
+                            entries {
+                              time
+                              total
+                            }
+                          }
+                        }
+                      }
+                    }
+                  }
+                }
+          """)
+INFO = minify("""
+        query Info {
           viewer {
             name
             userId
@@ -52,10 +125,10 @@ INFO = """
             websocketSubscriptionUrl
           }
         }
-        """
-LIVE_SUBSCRIBE = """
-            subscription{
-              liveMeasurement(homeId:"%s"){
+        """)
+LIVE_SUBSCRIBE = minify("""
+            subscription LiveMeasurement($homeId: ID!){
+              liveMeasurement(homeId: $homeId){
                 accumulatedConsumption
                 accumulatedConsumptionLastHour
                 accumulatedCost
@@ -82,11 +155,11 @@ LIVE_SUBSCRIBE = """
                 voltagePhase3
             }
            }
-        """
-PRICE_INFO = """
-        {
+        """)
+UPDATE_PRICE_INFO = minify("""
+        query UpdatePriceInfo($homeId: ID!) {
           viewer {
-            home(id: "%s") {
+            home(id: $homeId) {
               currentSubscription {
                 priceInfo(resolution: QUARTER_HOURLY) {
                   current {
@@ -98,11 +171,15 @@ PRICE_INFO = """
                     currency
                   }
                   today {
+                    energy
+                    tax
                     total
                     startsAt
                     level
                   }
                   tomorrow {
+                    energy
+                    tax
                     total
                     startsAt
                     level
@@ -112,97 +189,70 @@ PRICE_INFO = """
             }
           }
         }
-        """
-PUSH_NOTIFICATION = """
-        mutation{{
-          sendPushNotification(input: {{
-            title: "{}",
-            message: "{}",
-          }}){{
-            successful
-            pushedToNumberOfDevices
+        """)
+BATCH_HOMES = minify("""
+        query BatchHomes({0}) {{
+          viewer {{{1}
           }}
         }}
-        """
-UPDATE_CURRENT_PRICE = """
-        {
-          viewer {
-            home(id: "%s") {
-              currentSubscription {
-                priceInfo(resolution: QUARTER_HOURLY) {
-                  current {
+        """)
+BATCH_HOME = minify("""
+            h{0}: home(id: $homeId{0}) {{
+              currentSubscription {{
+                priceInfo(resolution: QUARTER_HOURLY) {{
+                  current {{
                     energy
                     tax
                     total
                     startsAt
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
-UPDATE_INFO = """
-        {
-          viewer {
-            home(id: "%s") {
-              appNickname
-              features {
-                  realTimeConsumptionEnabled
-                }
-              currentSubscription {
-                status
-              }
-              address {
-                address1
-                address2
-                address3
-                city
-                postalCode
-                country
-                latitude
-                longitude
-              }
-              meteringPointData {
-                consumptionEan
-                energyTaxType
-                estimatedAnnualConsumption
-                gridCompany
-                productionEan
-                vatType
-              }
-              owner {
-                name
-                isCompany
-                language
-                contactInfo {
-                  email
-                  mobile
-                }
-              }
-              timeZone
-              subscriptions {
-                id
-                status
-                validFrom
-                validTo
-                statusReason
-              }
-             currentSubscription {
-                    priceInfo {
-                      current {
-                        currency
-                      }
-                    }
-                  }
-                }
-              }
-            }
-        """
-UPDATE_INFO_PRICE = """
-        {
+                    level
+                    currency
+                  }}
+                  today {{
+                    energy
+                    tax
+                    total
+                    startsAt
+                    level
+                  }}
+                  tomorrow {{
+                    energy
+                    tax
+                    total
+                    startsAt
+                    level
+                  }}
+                }}
+              }}
+              consumption(resolution: HOURLY, last: $consumptionLast{0}) @include(if: $withConsumption{0}) {{
+                nodes {{
+                  from
+                  unitPrice
+                  totalCost
+                  cost
+                  consumption
+                }}
+              }}
+              production(resolution: HOURLY, last: $productionLast{0}) @include(if: $withProduction{0}) {{
+                nodes {{
+                  from
+                  unitPrice
+                  profit
+                  production
+                }}
+              }}
+            }}""")
+BATCH_HOME_VARIABLES = minify("""
+        $homeId{0}: ID!
+        $consumptionLast{0}: Int
+        $withConsumption{0}: Boolean!
+        $productionLast{0}: Int
+        $withProduction{0}: Boolean!
+        """)
+PRICE_INFO = minify("""
+        query PriceInfo($homeId: ID!) {
           viewer {
-            home(id: "%s") {
+            home(id: $homeId) {
               currentSubscription {
                 priceInfo(resolution: QUARTER_HOURLY) {
                   current {
@@ -211,27 +261,58 @@ UPDATE_INFO_PRICE = """
                     total
                     startsAt
                     level
+                    currency
                   }
                   today {
-                    energy
-                    tax
                     total
                     startsAt
                     level
                   }
                   tomorrow {
+                    total
+                    startsAt
+                    level
+                  }
+                }
+              }
+            }
+          }
+        }
+        """)
+PUSH_NOTIFICATION = minify("""
+        mutation SendPushNotification($title: String!, $message: String!) {
+          sendPushNotification(input: {title: $title, message: $message}) {
+            successful
+            pushedToNumberOfDevices
+          }
+        }
+        """)
+UPDATE_CURRENT_PRICE = minify("""
+        query UpdateCurrentPrice($homeId: ID!) {
+          viewer {
+            home(id: $homeId) {
+              currentSubscription {
+                priceInfo(resolution: QUARTER_HOURLY) {
+                  current {
                     energy
                     tax
                     total
                     startsAt
-                    level
                   }
                 }
               }
+            }
+          }
+        }
+        """)
+UPDATE_INFO = minify("""
+        query UpdateInfo($homeId: ID!) {
+          viewer {
+            home(id: $homeId) {
               appNickname
               features {
-                realTimeConsumptionEnabled
-              }
+                  realTimeConsumptionEnabled
+                }
               currentSubscription {
                 status
               }
@@ -270,9 +351,49 @@ UPDATE_INFO_PRICE = """
                 validTo
                 statusReason
               }
-              # currency is included in the priceInfo(resolution: QUARTER_HOURLY).current selection above
+             currentSubscription {
+                    priceInfo {
+                      current {
+                        currency
+                      }
+                    }
+                  }
+                }
+              }
             }
-          }
-        }
+        """)
+
+
+@functools.cache
+def document_hash(document: str) -> str:
+    """Return the SHA-256 hash of a document, the key of the document in caches.
+
+    :param document: The GraphQL document.
+    """
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+@functools.cache
+def operation_name(document: str) -> str:
+    """Return the operation name of a document, or its type if it has none.
+
+    :param document: The GraphQL document.
+    """
+    if (match := _OPERATION.match(document)) is None:
+        return "query"
+    return match.group(2) or match.group(1)
+
+
+@functools.cache
+def batch_homes(count: int) -> str:
+    """Return the document to update a number of homes in one request.
+
+    Home i is the alias h<i>, with the variables of BATCH_HOME_VARIABLES
+    suffixed with i, so there is one static document per number of homes.
 
-        """
+    :param count: The number of homes.
+    """
+    return BATCH_HOMES.format(
+        ",".join(BATCH_HOME_VARIABLES.format(index) for index in range(count)),
+        "".join(BATCH_HOME.format(index) for index in range(count)),
+    )
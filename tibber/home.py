@@ -3,22 +3,51 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import bisect
 import datetime as dt
 import logging
+import sqlite3
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping, Sequence
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any
 
-from gql import gql
-from websockets.exceptions import ConnectionClosedError
-
-from .const import RESOLUTION_HOURLY
+from websockets.exceptions import ConnectionClosed
+
+from .const import (
+    HISTORIC_PAGE_SIZE,
+    HOME_INFO_MAX_AGE,
+    PRICE_STALE_AFTER,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PRICE_RANK_DAY,
+    PRICE_RANK_WINDOWS,
+    RESOLUTION_DAILY,
+    RESOLUTION_HOURLY,
+    RESOLUTION_MONTHLY,
+    RT_CONNECT_TIMEOUT,
+    RT_DATA_TIMEOUT,
+    RT_MAILBOX_SIZE,
+)
 from .gql_queries import (
     HISTORIC_DATA,
     HISTORIC_PRICE,
-    LIVE_SUBSCRIBE,
         PRICE_INFO,
     UPDATE_CURRENT_PRICE,
     UPDATE_INFO,
-    UPDATE_INFO_PRICE,
+    UPDATE_PRICE_INFO,
+)
+from .mailbox import LatestValueMailbox
+from .prices import (
+    PRICE_SLOT_SECONDS,
+    CheapestWindow,
+    DayPriceStats,
+    PriceLevelView,
+    PriceRanks,
+    PriceSlot,
+    PriceStats,
+    PriceTimeline,
 )
 
 MIN_IN_HOUR = 60
@@ -30,6 +59,252 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.UTC)
+_SECOND = dt.timedelta(seconds=1)
+
+
+def history_cursor(day: dt.date) -> str:
+    """Return the cursor to page through historic data from the start of a day.
+
+    :param day: The first day of the data.
+    """
+    return base64.b64encode(day.isoformat().encode()).decode()
+
+
+class HourlyNode(Mapping[str, Any]):
+    """One hour of historic consumption or production.
+
+    The fields are stored in slots and the start time is parsed once. The
+    node is also a read-only mapping with the keys of the API node, so
+    callers using ``node["from"]`` or ``node.get("consumption")`` keep working.
+    """
+
+    __slots__ = (
+        "cost",
+        "energy",
+        "is_production",
+        "profit",
+        "starts_at",
+        "time",
+        "total_cost",
+        "unit_price",
+    )
+
+    _CONSUMPTION_KEYS = {
+        "from": "starts_at",
+        "unitPrice": "unit_price",
+        "totalCost": "total_cost",
+        "cost": "cost",
+        "consumption": "energy",
+    }
+    _PRODUCTION_KEYS = {
+        "from": "starts_at",
+        "unitPrice": "unit_price",
+        "profit": "profit",
+        "production": "energy",
+    }
+
+    def __init__(self, node: Mapping[str, Any], production: bool = False) -> None:
+        """Initialize the hour from an API node.
+
+        :param node: The node from the API, with an ISO 'from' timestamp.
+        :param production: True for a production node, False for consumption.
+        """
+        self.is_production = production
+        self.starts_at: str = node["from"]
+        self.time = dt.datetime.fromisoformat(self.starts_at)
+        self.unit_price: float | None = node.get("unitPrice")
+        self.energy: float | None = node.get("production" if production else "consumption")
+        self.total_cost: float | None = node.get("totalCost")
+        self.cost: float | None = node.get("cost")
+        self.profit: float | None = node.get("profit")
+
+    @property
+    def start(self) -> int:
+        """Return the start of the hour as POSIX timestamp."""
+        return (self.time - _EPOCH) // _SECOND
+
+    @property
+    def _keys(self) -> dict[str, str]:
+        """Return the API keys of the node and the fields they map to."""
+        return self._PRODUCTION_KEYS if self.is_production else self._CONSUMPTION_KEYS
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by its API key."""
+        return getattr(self, self._keys[key])
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the API keys."""
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        """Return the number of API keys."""
+        return len(self._keys)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the other node holds the same hour and values."""
+        if not isinstance(other, HourlyNode):
+            return super().__eq__(other)
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the representation of the node."""
+        return f"HourlyNode({self.starts_at}, energy={self.energy}, production={self.is_production})"
+
+
+class HourlyStore(Sequence[HourlyNode]):
+    """Ordered store of hourly nodes, keyed by the start epoch of the hour.
+
+    Nodes are kept sorted by time and a node for an hour that is already
+    stored replaces it in place, so corrected hours are updated instead of
+    duplicated. The store is a read-only sequence of the nodes, in time order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._keys: list[int] = []
+        self._nodes: dict[int, HourlyNode] = {}
+
+    def __getitem__(self, index):  # type: ignore[no-untyped-def]
+        """Return the node(s) at a position in time order."""
+        if isinstance(index, slice):
+            return [self._nodes[key] for key in self._keys[index]]
+        return self._nodes[self._keys[index]]
+
+    def __len__(self) -> int:
+        """Return the number of stored hours."""
+        return len(self._keys)
+
+    def clear(self) -> None:
+        """Remove all nodes."""
+        self._keys = []
+        self._nodes = {}
+
+    def upsert(self, nodes: Iterable[HourlyNode]) -> list[int]:
+        """Insert new hours and replace stored hours with the given nodes.
+
+        :param nodes: The hourly nodes.
+        :return: The keys of the hours that were inserted or changed.
+        """
+        changed: list[int] = []
+        for node in nodes:
+            key = node.start
+            if key not in self._nodes:
+                if not self._keys or key > self._keys[-1]:
+                    self._keys.append(key)
+                else:
+                    bisect.insort(self._keys, key)
+            elif self._nodes[key] == node:
+                continue
+            self._nodes[key] = node
+            changed.append(key)
+        return changed
+
+    def first_time(self) -> dt.datetime | None:
+        """Return the start time of the oldest stored hour."""
+        return self._nodes[self._keys[0]].time if self._keys else None
+
+    def node(self, key: int) -> HourlyNode:
+        """Return the node of an hour by its key."""
+        return self._nodes[key]
+
+    def time(self, key: int) -> dt.datetime:
+        """Return the start time of an hour by its key."""
+        return self._nodes[key].time
+
+    def items(self) -> Iterator[tuple[dt.datetime, HourlyNode]]:
+        """Iterate over (start time, node) pairs in time order."""
+        for key in self._keys:
+            node = self._nodes[key]
+            yield node.time, node
+
+
+class HourlyRollup:
+    """Running energy and money sums and peak hour of one period.
+
+    For every hour of the period (in time order) the sums and the peak up to
+    and including that hour are kept. A new or corrected hour only refolds
+    the hours from its position onwards, and the hours are folded in the same
+    order as a full pass over the period, so the totals are bit-identical to
+    a full recompute. As corrections are almost always for the latest hours,
+    an update costs O(number of changed hours).
+    """
+
+    __slots__ = ("_energies", "_energy_sums", "_keys", "_money_sums", "_moneys", "_peaks")
+
+    def __init__(self) -> None:
+        """Initialize the rollup."""
+        self._keys: list[int] = []
+        self._energies: list[float] = []
+        self._moneys: list[float | None] = []
+        self._energy_sums: list[float] = []
+        self._money_sums: list[float] = []
+        self._peaks: list[tuple[float, int | None]] = []
+
+    def __bool__(self) -> bool:
+        """Return True if the period has any hour with energy."""
+        return bool(self._keys)
+
+    def update(self, changes: Iterable[tuple[int, float | None, float | None]]) -> None:
+        """Insert, replace or remove hours and refold the running values.
+
+        :param changes: (key, energy, money) of every changed hour. Hours
+            without energy are removed, as a full pass would skip them.
+        """
+        first = len(self._keys)
+        for key, energy, money in changes:
+            pos = bisect.bisect_left(self._keys, key)
+            if pos < len(self._keys) and self._keys[pos] == key:
+                if energy is None:
+                    del self._keys[pos], self._energies[pos], self._moneys[pos]
+                else:
+                    self._energies[pos] = energy
+                    self._moneys[pos] = money
+            elif energy is not None:
+                self._keys.insert(pos, key)
+                self._energies.insert(pos, energy)
+                self._moneys.insert(pos, money)
+            else:
+                continue
+            first = min(first, pos)
+
+        del self._energy_sums[first:], self._money_sums[first:], self._peaks[first:]
+        energy_sum = self._energy_sums[-1] if self._energy_sums else 0
+        money_sum = self._money_sums[-1] if self._money_sums else 0
+        peak = self._peaks[-1] if self._peaks else (0, None)
+        for pos in range(first, len(self._keys)):
+            energy = self._energies[pos]
+            if energy > peak[0]:
+                peak = (energy, self._keys[pos])
+            energy_sum += energy
+            if (money := self._moneys[pos]) is not None:
+                money_sum += money
+            self._energy_sums.append(energy_sum)
+            self._money_sums.append(money_sum)
+            self._peaks.append(peak)
+
+    @property
+    def energy(self) -> float:
+        """Return the energy of the period."""
+        return self._energy_sums[-1] if self._energy_sums else 0
+
+    @property
+    def money(self) -> float:
+        """Return the money of the period."""
+        return self._money_sums[-1] if self._money_sums else 0
+
+    @property
+    def peak(self) -> tuple[float, int | None]:
+        """Return the energy and key of the first hour with the most energy."""
+        return self._peaks[-1] if self._peaks else (0, None)
+
+    @property
+    def last_key(self) -> int | None:
+        """Return the key of the last hour with energy."""
+        return self._keys[-1] if self._keys else None
+
 
 class HourlyData:
     """Holds hourly data for consumption or production."""
@@ -41,7 +316,48 @@ class HourlyData:
         self.peak_hour: float | None = None
         self.peak_hour_time: dt.datetime | None = None
         self.last_data_timestamp: dt.datetime | None = None
-        self.data: list[dict[Any, Any]] = []
+        self.data: HourlyStore = HourlyStore()
+        self.months: dict[tuple[int, int], HourlyRollup] = {}
+        self.archive_loaded: bool = False
+
+    def clear(self) -> None:
+        """Remove all hours and rollups."""
+        self.data.clear()
+        self.months = {}
+
+    def update(self, nodes: Iterable[Mapping[str, Any]], time_zone: dt.tzinfo) -> list[int]:
+        """Store the nodes and update the month rollups of changed hours.
+
+        :param nodes: Hourly nodes, or nodes from the API.
+        :param time_zone: The time zone that defines the month boundaries.
+        :return: The keys of the hours that were inserted or changed.
+        """
+        changed = self.data.upsert(
+            node if isinstance(node, HourlyNode) else HourlyNode(node, self.is_production) for node in nodes
+        )
+        month_changes: dict[tuple[int, int], list[tuple[int, float | None, float | None]]] = {}
+        for key in changed:
+            node = self.data.node(key)
+            change = (key, node.energy, node.profit if self.is_production else node.cost)
+            local_time = node.time.astimezone(time_zone)
+            month_changes.setdefault((local_time.year, local_time.month), []).append(change)
+        for month, changes in month_changes.items():
+            self.months.setdefault(month, HourlyRollup()).update(changes)
+        return changed
+
+    def update_month(self, local_now: dt.datetime) -> None:
+        """Update the month values from the rollup of the current month."""
+        month = self.months.get((local_now.year, local_now.month)) or HourlyRollup()
+        if (last_key := month.last_key) is not None:
+            _last_data_timestamp = self.data.time(last_key) + dt.timedelta(hours=1)
+            if self.last_data_timestamp is None or _last_data_timestamp > self.last_data_timestamp:
+                self.last_data_timestamp = _last_data_timestamp
+
+        peak_energy, peak_key = month.peak
+        self.month_energy = round(month.energy, 2)
+        self.month_money = round(month.money, 2)
+        self.peak_hour = round(peak_energy, 2)
+        self.peak_hour_time = None if peak_key is None else self.data.time(peak_key)
 
     @property
     def direction_name(self) -> str:
@@ -58,6 +374,50 @@ class HourlyData:
         return "cost"
 
 
+class RollingAverage:
+    """Average of the values of a sliding time window, updated in O(1).
+
+    Samples are kept in a deque with a running sum, so adding a sample and
+    dropping the ones that left the window is O(1) amortized. The sum is
+    recomputed once as many samples were dropped as the window holds, so
+    rounding errors of the running sum do not build up.
+    """
+
+    __slots__ = ("_dropped", "_samples", "_sum", "window")
+
+    def __init__(self, window: float) -> None:
+        """Initialize the average.
+
+        :param window: The length of the window in seconds.
+        """
+        self.window = window
+        self._samples: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def add(self, timestamp: float, value: float) -> float:
+        """Add a sample and return the average of the window ending at it.
+
+        :param timestamp: The POSIX timestamp of the sample.
+        :param value: The value of the sample.
+        """
+        samples = self._samples
+        start = timestamp - self.window
+        while samples and samples[0][0] < start:
+            self._sum -= samples.popleft()[1]
+            self._dropped += 1
+        samples.append((timestamp, value))
+        self._sum += value
+        if self._dropped >= len(samples):
+            self._sum = sum(sample[1] for sample in samples)
+            self._dropped = 0
+        return self._sum / len(samples)
+
+
 class TibberHome:
     """Instance of Tibber home."""
 
@@ -73,87 +433,116 @@ class TibberHome:
         self._tibber_control = tibber_control
         self._home_id: str = home_id
         self._current_price_info: dict[str, Any] = {}
-        self._price_info: dict[str, dict[str, Any]] = {}
+        self._price_info: dict[str, PriceSlot] = {}
+        self._price_timeline: PriceTimeline = PriceTimeline()
+        self._day_price_stats: dict[dt.date, DayPriceStats] = {}
+        self._price_ranks: PriceRanks = PriceRanks(self._price_timeline, "energy_wsi", (), dt.UTC)
+        self._price_total_ranks: PriceRanks = PriceRanks(self._price_timeline, "total", (), dt.UTC)
+        self._cheapest_windows: tuple[int | None, dict[int, CheapestWindow | None]] = (None, {})
         self._last_price_update: dt.datetime | None = None
-        self._level_info: dict[str, str] = {}
-        self._rt_power: list[tuple[dt.datetime, float]] = []
+        self._rt_power: RollingAverage = RollingAverage(tibber_control.rt_power_window)
         self.info: dict[str, dict[Any, Any]] = {}
         self.last_data_timestamp: dt.datetime | None = None
 
 
         self._hourly_consumption_data: HourlyData = HourlyData()
         self._hourly_production_data: HourlyData = HourlyData(production=True)
-        self._last_rt_data_received: dt.datetime = dt.datetime.now(tz=dt.UTC)
+        self._rt_loop: asyncio.AbstractEventLoop | None = None
+        self._rt_deadline: float = 0.0
+        self._rt_deadline_timer: asyncio.TimerHandle | None = None
         self._rt_listener: None | asyncio.Task[Any] = None
         self._rt_callback: Callable[..., Any] | None = None
+        self._rt_mailbox: LatestValueMailbox[dict[str, Any]] = LatestValueMailbox(RT_MAILBOX_SIZE)
         self._rt_stopped: bool = True
 
     async def _fetch_data(self, hourly_data: HourlyData) -> None:
         """Update hourly consumption or production data asynchronously."""
+        if (n_hours := await self._hours_to_fetch(hourly_data)) is None:
+            return
+
+        data = await self.get_historic_data(
+            n_hours,
+            resolution=RESOLUTION_HOURLY,
+            production=hourly_data.is_production,
+        )
+        await self._process_hourly_data(hourly_data, data)
+
+    async def _hours_to_fetch(self, hourly_data: HourlyData) -> int | None:
+        """Return the number of hours to fetch, None if the data is up to date."""
         now = dt.datetime.now(tz=dt.UTC)
-        local_now = now.astimezone(self._tibber_control.time_zone)
         n_hours = 60 * 24
+        keep_since = now - dt.timedelta(hours=n_hours + 24)
+
+        if not hourly_data.archive_loaded:
+            await self._load_archived_data(hourly_data, keep_since, now.astimezone(self._tibber_control.time_zone))
 
         if (
             not hourly_data.data
             or hourly_data.last_data_timestamp is None
-            or dt.datetime.fromisoformat(hourly_data.data[0]["from"]) < now - dt.timedelta(hours=n_hours + 24)
+            or hourly_data.data.first_time() < keep_since
         ):
-            hourly_data.data = []
-        else:
-            time_diff = now - hourly_data.last_data_timestamp
-            seconds_diff = time_diff.total_seconds()
-            n_hours = int(seconds_diff / 3600)
-            if n_hours < 1:
-                return
-            n_hours = max(2, int(n_hours))
+            hourly_data.clear()
+            return n_hours
 
-        data = await self.get_historic_data(
-            n_hours,
-            resolution=RESOLUTION_HOURLY,
-            production=hourly_data.is_production,
-        )
+        time_diff = now - hourly_data.last_data_timestamp
+        seconds_diff = time_diff.total_seconds()
+        n_hours = int(seconds_diff / 3600)
+        if n_hours < 1:
+            return None
+        return max(2, int(n_hours))
 
+    async def _process_hourly_data(self, hourly_data: HourlyData, data: list[dict[str, Any]]) -> None:
+        """Store fetched hourly nodes and update the month values."""
         if not data:
             _LOGGER.error("Could not find %s data.", hourly_data.direction_name)
             return
 
-        if not hourly_data.data:
-            hourly_data.data = data
-        else:
-            hourly_data.data = [entry for entry in hourly_data.data if entry not in data]
-            hourly_data.data.extend(data)
-
-  
-        _month_energy = 0
-        _month_money = 0
-        _month_hour_max_month_hour_energy = 0
-        _month_hour_max_month_hour: dt.datetime | None = None
-
-        for node in hourly_data.data:
-            _time = dt.datetime.fromisoformat(node["from"])
-            if _time.month != local_now.month or _time.year != local_now.year:
-                continue
-            if (energy := node.get(hourly_data.direction_name)) is None:
-                continue
-
-            if (
-                hourly_data.last_data_timestamp is None
-                or _time + dt.timedelta(hours=1) > hourly_data.last_data_timestamp
-            ):
-                hourly_data.last_data_timestamp = _time + dt.timedelta(hours=1)
-            if energy > _month_hour_max_month_hour_energy:
-                _month_hour_max_month_hour_energy = energy
-                _month_hour_max_month_hour = _time
-            _month_energy += energy
+        now = dt.datetime.now(tz=dt.UTC)
+        changed = hourly_data.update(data, self._tibber_control.time_zone)
+        await self._archive_data(hourly_data, changed, now - dt.timedelta(hours=60 * 24 + 24))
 
-            if node.get(hourly_data.money_name) is not None:
-                _month_money += node[hourly_data.money_name]
+        hourly_data.update_month(now.astimezone(self._tibber_control.time_zone))
 
-        hourly_data.month_energy = round(_month_energy, 2)
-        hourly_data.month_money = round(_month_money, 2)
-        hourly_data.peak_hour = round(_month_hour_max_month_hour_energy, 2)
-        hourly_data.peak_hour_time = _month_hour_max_month_hour
+    async def _load_archived_data(
+        self, hourly_data: HourlyData, since: dt.datetime, local_now: dt.datetime
+    ) -> None:
+        """Load the archived hours, so only the newer hours are fetched."""
+        hourly_data.archive_loaded = True
+        if (archive := self._tibber_control.archive) is None:
+            return
+        try:
+            nodes = await asyncio.get_running_loop().run_in_executor(
+                None, archive.load, self.home_id, hourly_data.is_production, since.timestamp()
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Could not load the archived %s data: %s", hourly_data.direction_name, err)
+            return
+        if not nodes:
+            return
+        hourly_data.update(nodes, self._tibber_control.time_zone)
+        for node in reversed(hourly_data.data):
+            if node.energy is not None:
+                hourly_data.last_data_timestamp = node.time + dt.timedelta(hours=1)
+                break
+        hourly_data.update_month(local_now)
+        _LOGGER.debug("Loaded %s archived hours of %s data", len(nodes), hourly_data.direction_name)
+
+    async def _archive_data(self, hourly_data: HourlyData, keys: list[int], keep_since: dt.datetime) -> None:
+        """Write new and corrected hours to the archive."""
+        if (archive := self._tibber_control.archive) is None or not keys:
+            return
+        nodes = [(key, hourly_data.data.node(key)) for key in keys]
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                archive.store,
+                self.home_id,
+                hourly_data.is_production,
+                nodes,
+                keep_since.timestamp(),
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Could not archive the %s data: %s", hourly_data.direction_name, err)
 
     async def fetch_consumption_data(self) -> None:
         """Update consumption info asynchronously."""
@@ -189,30 +578,84 @@ class TibberHome:
         return self._hourly_consumption_data.last_data_timestamp
 
     @property
-    def hourly_consumption_data(self) -> list[dict[Any, Any]]:
+    def hourly_consumption_data(self) -> HourlyStore:
         """Get consumption data for the last 30 days."""
         return self._hourly_consumption_data.data
 
     @property
-    def hourly_production_data(self) -> list[dict[Any, Any]]:
+    def hourly_production_data(self) -> HourlyStore:
         """Get production data for the last 30 days."""
         return self._hourly_production_data.data
 
-    async def update_info(self) -> None:
-        """Update home info and the current price info asynchronously."""
-        if data := await self._tibber_control.execute(UPDATE_INFO % self._home_id):
+    async def update_info(self, max_age: float | None = None) -> None:
+        """Update home info and the current price info asynchronously.
+
+        :param max_age: Use home info cached at most this many seconds ago, None to always request it.
+        """
+        if data := await self._tibber_control.execute(
+            UPDATE_INFO, {"homeId": self._home_id}, max_age=max_age
+        ):
             self.info = data
 
     async def update_info_and_price_info(self) -> None:
-        """Update home info and all price info asynchronously."""
-        if data := await self._tibber_control.execute(UPDATE_INFO_PRICE % self._home_id):
-            self.info = data
+        """Update home info and all price info asynchronously.
+
+        The home info rarely changes and is cached for a day, so only the
+        price info is requested every time. Both are merged into the info.
+        """
+        await self.update_info(max_age=HOME_INFO_MAX_AGE)
+        if price_info := await self._tibber_control.execute(
+            UPDATE_PRICE_INFO, {"homeId": self._home_id}, priority=PRIORITY_INTERACTIVE
+        ):
+            self.info = self._merge_price_info(self.info, price_info)
             self._process_price_info(self.info)
 
+    @staticmethod
+    def _merge_price_info(info: dict[str, Any], price_info: dict[str, Any]) -> dict[str, Any]:
+        """Return a copy of the home info with the price info of a price query."""
+        subscription = (price_info["viewer"]["home"] or {}).get("currentSubscription")
+        if not info or not subscription:
+            return info or price_info
+        home = dict(info["viewer"]["home"])
+        home["currentSubscription"] = {
+            **(home.get("currentSubscription") or {}),
+            "priceInfo": subscription["priceInfo"],
+        }
+        return {**info, "viewer": {**info["viewer"], "home": home}}
+
+    async def batch_update_variables(self) -> dict[str, Any]:
+        """Return the variables of this home in a batched update.
+
+        The hourly consumption data, and the production data of homes with
+        production, is only included when it is not up to date.
+        """
+        variables: dict[str, Any] = {"homeId": self._home_id}
+        for hourly_data in (self._hourly_consumption_data, self._hourly_production_data):
+            n_hours = None
+            if not hourly_data.is_production or self.has_production:
+                n_hours = await self._hours_to_fetch(hourly_data)
+            variables[f"with{hourly_data.direction_name.capitalize()}"] = n_hours is not None
+            variables[f"{hourly_data.direction_name}Last"] = n_hours
+        return variables
+
+    async def process_batch_update(self, home: dict[str, Any] | None) -> None:
+        """Process the fields of this home in the response of a batched update."""
+        if home is None:
+            _LOGGER.error("Could not find home %s in the batched update.", self._home_id)
+            return
+        price_info = {"viewer": {"home": {"currentSubscription": home.get("currentSubscription")}}}
+        self.info = self._merge_price_info(self.info, price_info)
+        self._process_price_info(self.info)
+        for hourly_data in (self._hourly_consumption_data, self._hourly_production_data):
+            if hourly_data.direction_name in home:
+                nodes = (home[hourly_data.direction_name] or {}).get("nodes") or []
+                await self._process_hourly_data(hourly_data, nodes)
+
     async def update_current_price_info(self) -> None:
         """Update just the current price info asynchronously."""
-        query = UPDATE_CURRENT_PRICE % self.home_id
-        price_info_temp = await self._tibber_control.execute(query)
+        price_info_temp = await self._tibber_control.execute(
+            UPDATE_CURRENT_PRICE, {"homeId": self.home_id}, priority=PRIORITY_INTERACTIVE
+        )
         if not price_info_temp:
             _LOGGER.error("Could not find current price info.")
             return
@@ -229,64 +672,50 @@ class TibberHome:
     async def update_price_info(self) -> None:
         """Update the current price info, todays price info
         and tomorrows price info asynchronously."""
-        if price_info := await self._tibber_control.execute(PRICE_INFO % self.home_id):
+        if price_info := await self._tibber_control.execute(
+            PRICE_INFO, {"homeId": self.home_id}, priority=PRIORITY_INTERACTIVE
+        ):
             self._process_price_info(price_info)
 
     def getCurrentPrices(self, hourstart: int, hourend: int) -> float:
-        """Get price rank for the current hour within specified time window.
+        """Get price rank for the current quarter-hour within specified time window.
         
         Returns value between 0-1, where:
-        - 0 = cheapest hour in window
-        - 1 = most expensive hour in window
+        - 0 = cheapest quarter-hour in window
+        - 1 = most expensive quarter-hour in window
         - 0.5 = median price
         """
-        pricelist = []
-        now = dt.datetime.now().astimezone(self._tibber_control.time_zone)
-        
-        # Collect all prices for today within the specified window
-        for date in self._price_info:
-            timestamp = self._price_info[date]['timestamp']
-            if timestamp.day == now.day:
-                if hourstart <= timestamp.hour <= hourend:
-                    pricelist.append({
-                        'hour': timestamp.hour,
-                        'price': self._price_info[date]['energy_wsi']
-                    })
-        
-        if not pricelist:
+        window = (hourstart, hourend)
+        if window in self._price_ranks:
+            ranks = self._price_ranks
+        else:
+            ranks = PriceRanks(self._price_timeline, "energy_wsi", (window,), self._tibber_control.time_zone)
+
+        if (index := self._current_price_index()) is None:
             return 1.0  # Default to most expensive if no data
-            
-        # Sort prices to determine rank
-        sorted_prices = sorted(pricelist, key=lambda x: x['price'])
-        current_hour = now.hour
-        
-        # Find position of current hour in sorted list
-        for index, price_data in enumerate(sorted_prices):
-            if price_data['hour'] == current_hour:
-                # Convert to 0-1 range where 0 is cheapest
-                return index / (len(sorted_prices) - 1) if len(sorted_prices) > 1 else 0.5
-                
-        return 1.0  # Default to most expensive if current hour not found
+        if (rank := ranks.rank(index, window)) is None:
+            return 1.0  # Default to most expensive if current quarter-hour is outside the window
+        return rank
 
 
     @property
     def hour_cheapest_top(self) -> float:
-        """Get price rank (0-1) for current hour compared to all hours today."""
+        """Get price rank (0-1) for current quarter-hour compared to all of today."""
         return self.getCurrentPrices(0, 23)
 
     @property
     def hour_cheapest_top_after_0000(self) -> float:
-        """Get price rank (0-1) for current hour in night window (00:00-08:00)."""
+        """Get price rank (0-1) for current quarter-hour in night window (00:00-08:00)."""
         return self.getCurrentPrices(0, 7)
     
     @property
     def hour_cheapest_top_after_0800(self) -> float:
-        """Get price rank (0-1) for current hour in day window (08:00-18:00)."""
+        """Get price rank (0-1) for current quarter-hour in day window (08:00-18:00)."""
         return self.getCurrentPrices(8, 17)
     
     @property
     def hour_cheapest_top_after_1800(self) -> float:
-        """Get price rank (0-1) for current hour in evening window (18:00-00:00)."""
+        """Get price rank (0-1) for current quarter-hour in evening window (18:00-00:00)."""
         return self.getCurrentPrices(18, 23)
 
     def _process_price_info(self, price_info: dict[str, dict[str, Any]]) -> None:
@@ -300,7 +729,6 @@ class TibberHome:
             _LOGGER.error("Could not find price info.")
             return
         self._price_info = {}
-        self._level_info = {}
         # record when price info was last processed
         self._last_price_update = dt.datetime.now().astimezone(self._tibber_control.time_zone)
 
@@ -330,34 +758,42 @@ class TibberHome:
                 starts_at = data.get("startsAt")
                 try:
                     ts = dt.datetime.fromisoformat(starts_at)
-                    minute = ts.minute
-                    if minute not in (0, 15, 30, 45):
-                        non_quarter_entries += 1
-                        _LOGGER.debug(
-                            "Non-quarter timestamp in priceInfo: %s (minute=%s)",
-                            starts_at,
-                            minute,
-                        )
-                except Exception:
-                    # ignore parse errors but count entry
+                except (TypeError, ValueError):
                     _LOGGER.debug("Could not parse startsAt: %s", starts_at)
+                    continue
+                if ts.minute not in (0, 15, 30, 45):
+                    non_quarter_entries += 1
+                    _LOGGER.debug(
+                        "Non-quarter timestamp in priceInfo: %s (minute=%s)",
+                        starts_at,
+                        ts.minute,
+                    )
 
-                self._price_info[data.get("startsAt")] = { 
-                    'total': data.get("total"),  # The total price (energy + taxes)
-                    'energy': data.get("energy"),  # Nord Pool spot price
-                    'energy_ws': data.get("energy") + self._tibber_control.purchasing_compensation,
-                    'energy_wsi': (data.get("energy") + self._tibber_control.purchasing_compensation) * self._tibber_control.tax_rate,
+                energy_ws = data.get("energy") + self._tibber_control.purchasing_compensation
+                self._price_info[starts_at] = PriceSlot(
+                    starts_at,
+                    ts,
+                    total=data.get("total"),  # The total price (energy + taxes)
+                    energy=data.get("energy"),  # Nord Pool spot price
+                    energy_ws=energy_ws,
+                    energy_wsi=energy_ws * self._tibber_control.tax_rate,
                     # The tax part of the price (guarantee of origin certificate, energy tax (Sweden only) and VAT)
                     # NOTE: For non-Swedish countries, this includes VAT on the spot price + other fixed costs
-                    'tax': data.get("tax"),
-                    'timestamp' :   dt.datetime.fromisoformat(data.get("startsAt"))                 
-                }
-                self._level_info[data.get("startsAt")] = data.get("level")
-                if (
-                    not self.last_data_timestamp
-                    or dt.datetime.fromisoformat(data.get("startsAt")) > self.last_data_timestamp
-                ):
-                    self.last_data_timestamp = dt.datetime.fromisoformat(data.get("startsAt"))
+                    tax=data.get("tax"),
+                    level=data.get("level"),
+                )
+                if not self.last_data_timestamp or ts > self.last_data_timestamp:
+                    self.last_data_timestamp = ts
+
+        self._price_timeline = PriceTimeline(self._price_info.values())
+        self._day_price_stats = self._price_timeline.daily_stats(self._tibber_control.time_zone)
+        self._price_ranks = PriceRanks(
+            self._price_timeline, "energy_wsi", PRICE_RANK_WINDOWS, self._tibber_control.time_zone
+        )
+        self._price_total_ranks = PriceRanks(
+            self._price_timeline, "total", (PRICE_RANK_DAY,), self._tibber_control.time_zone
+        )
+        self._cheapest_windows = (None, {})
 
         _LOGGER.debug(
             "Processed priceInfo: total_entries=%s non_quarter_entries=%s",
@@ -365,6 +801,23 @@ class TibberHome:
             non_quarter_entries,
         )
 
+    def _current_price_index(self) -> int | None:
+        """Return the timeline index of the price slot covering the current time."""
+        return self._price_timeline.index_at(dt.datetime.now(tz=dt.UTC))
+
+    def _price_stats(self, days_ahead: int, column: str) -> PriceStats | None:
+        """Return the aggregated prices of a local day relative to today.
+
+        The aggregates are keyed by local date, so they roll over to the next
+        day at local midnight without being recomputed.
+
+        :param days_ahead: 0 for today, 1 for tomorrow.
+        :param column: 'total' or 'energy'.
+        """
+        today = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone).date()
+        if (day_stats := self._day_price_stats.get(today + dt.timedelta(days=days_ahead))) is None:
+            return None
+        return getattr(day_stats, column)
 
 
     def sortHours(self, date_start, date_end) -> dict[str, float]:
@@ -394,51 +847,30 @@ class TibberHome:
     @property
     def price_total(self) -> dict[str, float]:
         """Get dictionary with price total, key is date-time as a string."""
-        retval = {}
-        for date in self._price_info:
-            retval[date] = self._price_info[date]['total']
-
-        return retval
+        return {date: slot.total for date, slot in self._price_info.items()}
     
     @property
     def price_energy(self) -> dict[str, float]:
         """Get dictionary with price total, key is date-time as a string."""
-        retval = {}
-        for date in self._price_info:
-            retval[date] = self._price_info[date]['energy']
-
-        return retval
+        return {date: slot.energy for date, slot in self._price_info.items()}
     
     @property
-    def price_info(self) -> dict[str, float]:
-        """Get price info."""
-        return self._price_info
+    def price_info(self) -> Mapping[str, PriceSlot]:
+        """Get read-only price info, key is date-time as a string."""
+        return MappingProxyType(self._price_info)
     
     @property
     def electricity_price(self) -> float | None:
         """Get current price total."""
-        # Prefer a matching quarter-hour entry from the populated price_info
-        # If an entry in self._price_info has a timestamp that covers the
-        # current time (within a 15 minute window) return that entry's total.
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-
-        # search _price_info for an entry where now is >= timestamp and < timestamp + 15min
-        try:
-            for entry in self._price_info.values():
-                ts = entry.get("timestamp")
-                if not isinstance(ts, dt.datetime):
-                    continue
-                if ts <= now < (ts + dt.timedelta(minutes=15)):
-                    return entry.get("total")
-        except Exception:
-            # if _price_info is not populated or has unexpected structure, fall back
-            pass
+        # Prefer the quarter-hour entry from the price timeline covering now
+        if (index := self._current_price_index()) is not None:
+            return self._price_timeline.totals[index]
 
         # fallback to current price info (may come from UPDATE_CURRENT_PRICE)
         if not self._current_price_info:
             return None
         return self._current_price_info.get("total")
-    
+
     @property
     def electricity_price_calc(self) -> float | None:
         """Get calculated total price including all components (for debugging).
@@ -516,22 +948,9 @@ class TibberHome:
     @property
     def electricity_price_excl_base(self) -> float | None:
         """Get the base price without surcharge (energy field from API)."""
-        # Prefer a matching quarter-hour entry from the populated price_info
-        # If an entry in self._price_info has a timestamp that covers the
-        # current time (within a 15 minute window) return that entry's energy.
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-
-        # search _price_info for an entry where now is >= timestamp and < timestamp + 15min
-        try:
-            for entry in self._price_info.values():
-                ts = entry.get("timestamp")
-                if not isinstance(ts, dt.datetime):
-                    continue
-                if ts <= now < (ts + dt.timedelta(minutes=15)):
-                    return entry.get("energy")
-        except Exception:
-            # if _price_info is not populated or has unexpected structure, fall back
-            pass
+        # Prefer the quarter-hour entry from the price timeline covering now
+        if (index := self._current_price_index()) is not None:
+            return self._price_timeline.energies[index]
 
         # fallback to current price info (may come from UPDATE_CURRENT_PRICE)
         if not self._current_price_info:
@@ -565,11 +984,40 @@ class TibberHome:
         """Get last price update."""
         return self._last_price_update
 
+    @property
+    def update_cycle_duration(self) -> float | None:
+        """Return the seconds the last update cycle took."""
+        return self._tibber_control.metrics.last_duration("update_cycle")
+
+    @property
+    def batch_request_duration(self) -> float | None:
+        """Return the seconds the last batched update request took."""
+        return self._tibber_control.metrics.last_duration("batch_request")
+
+    @property
+    def api_bytes_received(self) -> int:
+        """Return the bytes received from the Tibber API."""
+        return self._tibber_control.metrics.bytes_in
+
+    @property
+    def api_retry_count(self) -> int:
+        """Return the number of retried Tibber API requests."""
+        return self._tibber_control.metrics.retries
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the data is served from cache because it could not be refreshed."""
+        if not self._tibber_control.api_available:
+            return True
+        if self._last_price_update is None:
+            return False
+        return dt.datetime.now(tz=dt.UTC) - self._last_price_update > dt.timedelta(seconds=PRICE_STALE_AFTER)
+
 
     @property
-    def price_level(self) -> dict[str, str]:
-        """Get dictionary with price level, key is date-time as a string."""
-        return self._level_info
+    def price_level(self) -> Mapping[str, str | None]:
+        """Get read-only price level, key is date-time as a string."""
+        return PriceLevelView(self._price_info)
 
     @property
     def home_id(self) -> str:
@@ -635,18 +1083,82 @@ class TibberHome:
 
         Possible values: 'quarter_hour' or 'current' (fallback).
         """
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        try:
-            for entry in self._price_info.values():
-                ts = entry.get("timestamp")
-                if not isinstance(ts, dt.datetime):
-                    continue
-                if ts <= now < (ts + dt.timedelta(minutes=15)):
-                    return "quarter_hour"
-        except Exception:
-            pass
+        if self._current_price_index() is not None:
+            return "quarter_hour"
         return "current"
 
+    @property
+    def current_price_key(self) -> str | None:
+        """Return the startsAt key of the price slot covering the current time."""
+        if (index := self._current_price_index()) is None:
+            return None
+        return self._price_timeline.keys[index]
+
+    @property
+    def price_timeline(self) -> PriceTimeline:
+        """Get the time-sorted price timeline."""
+        return self._price_timeline
+
+    def find_cheapest_window(
+        self,
+        duration: dt.timedelta,
+        earliest: dt.datetime | None = None,
+        deadline: dt.datetime | None = None,
+        contiguous: bool = True,
+    ) -> CheapestWindow | None:
+        """Find the cheapest quarter-hours to run a load for a duration.
+
+        :param duration: How long the load must run, rounded up to whole quarter-hours.
+        :param earliest: The earliest start, defaults to now.
+        :param deadline: The time the load must be finished by, defaults to
+            the end of the known prices.
+        :param contiguous: True if the load must run without interruption.
+        """
+        n_slots = -(-int(duration.total_seconds()) // PRICE_SLOT_SECONDS)
+        earliest_ts = (earliest or dt.datetime.now(tz=dt.UTC)).timestamp()
+        deadline_ts = deadline.timestamp() if deadline is not None else float("inf")
+        indexes = self._price_timeline.find_cheapest_window(n_slots, earliest_ts, deadline_ts, contiguous)
+        if indexes is None:
+            return None
+        slots = tuple(self._price_timeline.slots[index] for index in indexes)
+        return CheapestWindow(
+            start=dt.datetime.fromtimestamp(slots[0].start, self._tibber_control.time_zone),
+            end=dt.datetime.fromtimestamp(slots[-1].start + PRICE_SLOT_SECONDS, self._tibber_control.time_zone),
+            average=sum(slot.total for slot in slots) / len(slots),
+            slots=slots,
+        )
+
+    def cheapest_window(self, hours: int) -> CheapestWindow | None:
+        """Get the cheapest contiguous window of whole hours from now on.
+
+        The result is cached until the current quarter-hour or the prices change.
+        """
+        index = self._current_price_index()
+        if self._cheapest_windows[0] != index:
+            self._cheapest_windows = (index, {})
+        windows = self._cheapest_windows[1]
+        if hours not in windows:
+            windows[hours] = self.find_cheapest_window(dt.timedelta(hours=hours))
+        return windows[hours]
+
+    @property
+    def cheapest_window_1h(self) -> dt.datetime | None:
+        """Get the start of the cheapest contiguous hour from now on."""
+        window = self.cheapest_window(1)
+        return window.start if window else None
+
+    @property
+    def cheapest_window_2h(self) -> dt.datetime | None:
+        """Get the start of the cheapest contiguous 2 hours from now on."""
+        window = self.cheapest_window(2)
+        return window.start if window else None
+
+    @property
+    def cheapest_window_3h(self) -> dt.datetime | None:
+        """Get the start of the cheapest contiguous 3 hours from now on."""
+        window = self.cheapest_window(3)
+        return window.start if window else None
+
     @property
     def country(self) -> str:
         """Return the country."""
@@ -675,264 +1187,75 @@ class TibberHome:
     @property
     def electricity_price_today_min(self) -> float | None:
         """Get minimum price for today."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("total")
-                if price is not None:
-                    today_prices.append(price)
-        
-        return min(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "total")
+        return stats.min if stats else None
+
     @property
     def electricity_price_today_max(self) -> float | None:
         """Get maximum price for today."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("total")
-                if price is not None:
-                    today_prices.append(price)
-        
-        return max(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "total")
+        return stats.max if stats else None
+
     @property
     def electricity_price_today_avg(self) -> float | None:
         """Get average price for today."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("total")
-                if price is not None:
-                    today_prices.append(price)
-        
-        return sum(today_prices) / len(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "total")
+        return stats.avg if stats else None
+
     @property
     def electricity_price_tomorrow_min(self) -> float | None:
         """Get minimum price for tomorrow."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("total")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return min(tomorrow_prices) if tomorrow_prices else None
-    
+        stats = self._price_stats(1, "total")
+        return stats.min if stats else None
+
     @property
     def electricity_price_tomorrow_max(self) -> float | None:
         """Get maximum price for tomorrow."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("total")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return max(tomorrow_prices) if tomorrow_prices else None
-    
+        stats = self._price_stats(1, "total")
+        return stats.max if stats else None
+
     @property
     def electricity_price_tomorrow_avg(self) -> float | None:
         """Get average price for tomorrow."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("total")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return sum(tomorrow_prices) / len(tomorrow_prices) if tomorrow_prices else None
-    
+        stats = self._price_stats(1, "total")
+        return stats.avg if stats else None
+
     # Spotprice sensors (for solar feed-in post-2027)
     @property
     def electricity_spotprice_today_min(self) -> float | None:
         """Get minimum spotprice for today (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("energy")  # Spotprice without surcharges
-                if price is not None:
-                    today_prices.append(price)
-        
-        return min(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "energy")
+        return stats.min if stats else None
+
     @property
     def electricity_spotprice_today_max(self) -> float | None:
         """Get maximum spotprice for today (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("energy")
-                if price is not None:
-                    today_prices.append(price)
-        
-        return max(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "energy")
+        return stats.max if stats else None
+
     @property
     def electricity_spotprice_today_avg(self) -> float | None:
         """Get average spotprice for today (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + dt.timedelta(days=1)
-        
-        today_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if today_start <= ts < today_end:
-                price = entry.get("energy")
-                if price is not None:
-                    today_prices.append(price)
-        
-        return sum(today_prices) / len(today_prices) if today_prices else None
-    
+        stats = self._price_stats(0, "energy")
+        return stats.avg if stats else None
+
     @property
     def electricity_spotprice_tomorrow_min(self) -> float | None:
         """Get minimum spotprice for tomorrow (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("energy")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return min(tomorrow_prices) if tomorrow_prices else None
-    
+        stats = self._price_stats(1, "energy")
+        return stats.min if stats else None
+
     @property
     def electricity_spotprice_tomorrow_max(self) -> float | None:
         """Get maximum spotprice for tomorrow (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("energy")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return max(tomorrow_prices) if tomorrow_prices else None
-    
+        stats = self._price_stats(1, "energy")
+        return stats.max if stats else None
+
     @property
     def electricity_spotprice_tomorrow_avg(self) -> float | None:
         """Get average spotprice for tomorrow (excl. surcharges)."""
-        now = dt.datetime.now(tz=dt.UTC).astimezone(self._tibber_control.time_zone)
-        tomorrow_start = now.replace(hour=0, minute=0, second=0, microsecond=0) + dt.timedelta(days=1)
-        tomorrow_end = tomorrow_start + dt.timedelta(days=1)
-        
-        tomorrow_prices = []
-        for entry in self._price_info.values():
-            ts = entry.get("timestamp")
-            if not isinstance(ts, dt.datetime):
-                continue
-            if tomorrow_start <= ts < tomorrow_end:
-                price = entry.get("energy")
-                if price is not None:
-                    tomorrow_prices.append(price)
-        
-        return sum(tomorrow_prices) / len(tomorrow_prices) if tomorrow_prices else None
-
-    def current_price_rank(self, price_total: list[dict[str, float]], price_time: dt.datetime | None) -> float | None:
-        """Get normalized rank (0-1) of current price compared to other prices today.
-        
-        Args:
-            price_total: List of price dictionaries with 'hour' and 'price' keys
-            price_time: The timestamp to get rank for
-            
-        Returns:
-            float between 0-1 where:
-            - 0 = cheapest price of the day
-            - 1 = most expensive price of the day
-            - None if price cannot be ranked
-        """
-        if price_time is None or not price_total:
-            return None
-            
-        try:
-            # Sort prices from lowest to highest
-            sorted_prices = sorted(price_total, key=lambda x: float(x['price']))
-            
-            # Find position of current price
-            current_hour = price_time.hour
-            for index, price_data in enumerate(sorted_prices):
-                if price_data['hour'] == current_hour:
-                    # Convert to 0-1 range
-                    return index / (len(sorted_prices) - 1) if len(sorted_prices) > 1 else 0.5
-                    
-            return None
-            
-        except (KeyError, ValueError, ZeroDivisionError):
-            _LOGGER.warning("Could not calculate price rank", exc_info=True)
-            return None
+        stats = self._price_stats(1, "energy")
+        return stats.avg if stats else None
 
     def current_price_data(self) -> tuple[float | None, dt.datetime | None, float | None]:
         """Get current price data.
@@ -943,31 +1266,33 @@ class TibberHome:
             - Price timestamp (datetime or None)
             - Price rank 0-1 (float or None)
         """
-        now = dt.datetime.now(self._tibber_control.time_zone)
-        
-        # Convert price_total to list format needed for ranking
-        price_list = []
-        for timestamp, data in self._price_info.items():
-            price_time = dt.datetime.fromisoformat(timestamp).astimezone(self._tibber_control.time_zone)
-            if price_time.date() == now.date():
-                price_list.append({
-                    'hour': price_time.hour,
-                    'price': data.get('total', 0)
-                })
-        
-        # Find current price
-        for key, data in self._price_info.items():
-            price_time = dt.datetime.fromisoformat(key).astimezone(self._tibber_control.time_zone)
-            time_diff = (now - price_time).total_seconds() / MIN_IN_HOUR
-            
-            if 0 <= time_diff < MIN_IN_HOUR:
-                price = data.get('total')
-                if price is not None:
-                    price = round(float(price), 3)
-                rank = self.current_price_rank(price_list, price_time)
-                return price, price_time, rank
-                
-        return None, None, None
+        if (index := self._current_price_index()) is None:
+            return None, None, None
+
+        slot = self._price_timeline.slots[index]
+        price = round(float(slot.total), 3) if slot.total is not None else None
+        price_time = dt.datetime.fromtimestamp(slot.start, self._tibber_control.time_zone)
+        return price, price_time, self._price_total_ranks.rank(index, PRICE_RANK_DAY)
+
+    def _add_extra_data(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Add the estimated consumption of the hour to a live measurement.
+
+        The estimate extrapolates the consumption so far with the average
+        power of the rolling window, and the peak hour follows the live data.
+        """
+        live_data = data["data"]["liveMeasurement"]
+        _timestamp = dt.datetime.fromisoformat(live_data["timestamp"]).astimezone(self._tibber_control.time_zone)
+        power = self._rt_power.add(_timestamp.timestamp(), live_data["power"] / 1000)
+        current_hour = live_data["accumulatedConsumptionLastHour"]
+        if current_hour is not None:
+            live_data["estimatedHourConsumption"] = round(
+                current_hour + power * (3600 - (_timestamp.minute * 60 + _timestamp.second)) / 3600,
+                3,
+            )
+            if self._hourly_consumption_data.peak_hour and current_hour > self._hourly_consumption_data.peak_hour:
+                self._hourly_consumption_data.peak_hour = round(current_hour, 2)
+                self._hourly_consumption_data.peak_hour_time = _timestamp
+        return data
 
     async def rt_subscribe(self, callback: Callable[..., Any]) -> None:
         """Connect to Tibber and subscribe to Tibber real time subscription.
@@ -975,52 +1300,35 @@ class TibberHome:
         :param callback: The function to call when data is received.
         """
 
-        def _add_extra_data(data: dict[str, Any]) -> dict[str, Any]:
-            live_data = data["data"]["liveMeasurement"]
-            _timestamp = dt.datetime.fromisoformat(live_data["timestamp"]).astimezone(self._tibber_control.time_zone)
-            while self._rt_power and self._rt_power[0][0] < _timestamp - dt.timedelta(minutes=5):
-                self._rt_power.pop(0)
-
-            self._rt_power.append((_timestamp, live_data["power"] / 1000))
-            current_hour = live_data["accumulatedConsumptionLastHour"]
-            if current_hour is not None:
-                power = sum(p[1] for p in self._rt_power) / len(self._rt_power)
-                live_data["estimatedHourConsumption"] = round(
-                    current_hour + power * (3600 - (_timestamp.minute * 60 + _timestamp.second)) / 3600,
-                    3,
-                )
-                if self._hourly_consumption_data.peak_hour and current_hour > self._hourly_consumption_data.peak_hour:
-                    self._hourly_consumption_data.peak_hour = round(current_hour, 2)
-                    self._hourly_consumption_data.peak_hour_time = _timestamp
-            return data
-
         async def _start() -> None:
             """Subscribe to Tibber."""
-            for _ in range(30):
-                if self._rt_stopped:
-                    _LOGGER.debug("Stopping rt_subscribe")
-                    return
-                if self._tibber_control.realtime.subscription_running:
-                    break
-
-                _LOGGER.debug("Waiting for rt_connect")
-                await asyncio.sleep(1)
-            else:
+            _LOGGER.debug("Waiting for rt_connect")
+            running = await self._tibber_control.realtime.wait_running(RT_CONNECT_TIMEOUT)
+            if self._rt_stopped:
+                _LOGGER.debug("Stopping rt_subscribe")
+                return
+            if not running:
                 _LOGGER.error("rt not running")
+                self._tibber_control.realtime.request_reconnect()
                 return
-            assert self._tibber_control.realtime.sub_manager is not None
 
+            # De reader wacht nooit op de callback, een trage listener krijgt de nieuwste meting
+            self._rt_mailbox.clear()
+            dispatcher = asyncio.create_task(self._dispatch_rt_data(callback))
+            first_message = True
             try:
-                async for _data in self._tibber_control.realtime.sub_manager.session.subscribe(
-                    gql(LIVE_SUBSCRIBE % self.home_id)
-                ):
+                async for _data in self._tibber_control.realtime.subscribe(self.home_id):
                     data = {"data": _data}
                     try:
-                        data = _add_extra_data(data)
+                        data = self._add_extra_data(data)
                     except KeyError:
                         pass
-                    callback(data)
-                    self._last_rt_data_received = dt.datetime.now(tz=dt.UTC)
+                    self._rt_mailbox.put(data)
+                    # Alleen de deadline verschuiven, de timer loopt pas af als er echt niets meer komt
+                    self._rt_deadline = loop.time() + RT_DATA_TIMEOUT
+                    if first_message:
+                        first_message = False
+                        self._observe_first_rt_message(loop)
                     _LOGGER.debug(
                         "Data received for %s: %s",
                         self.home_id,
@@ -1028,8 +1336,8 @@ class TibberHome:
                     )
                     if self._rt_stopped or not self._tibber_control.realtime.subscription_running:
                         _LOGGER.debug("Stopping rt_subscribe loop")
-                        return
-            except ConnectionClosedError as err:
+                        break
+            except ConnectionClosed as err:
                 _LOGGER.warning(
                     "WebSocket verbinding verbroken voor %s (wordt automatisch hersteld): %s",
                     self.name,
@@ -1042,23 +1350,87 @@ class TibberHome:
                     str(err),
                     exc_info=True,
                 )
-
+            finally:
+                dispatcher.cancel()
+                # Metingen die de dispatcher nog niet had afgegeven alsnog doorgeven
+                for data in self._rt_mailbox.drain():
+                    self._deliver_rt_data(callback, data)
+            if not self._rt_stopped:
+                self._tibber_control.realtime.request_reconnect()
+
+        loop = asyncio.get_running_loop()
         self._rt_callback = callback
         self._rt_listener = asyncio.create_task(_start())
         self._rt_stopped = False
+        self._arm_rt_deadline(loop)
         await self._tibber_control.realtime.connect()
         self._tibber_control.realtime.add_home(self)
 
-    async def rt_resubscribe(self) -> None:
-        """Resubscribe to Tibber data."""
+    def _arm_rt_deadline(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the deadline timer of the realtime subscription.
+
+        :param loop: The event loop running the subscription.
+        """
+        self._rt_loop = loop
+        self._rt_deadline = loop.time() + RT_DATA_TIMEOUT
+        if self._rt_deadline_timer is None:
+            self._rt_deadline_timer = loop.call_at(self._rt_deadline, self._rt_deadline_expired)
+
+    def _observe_first_rt_message(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Record the seconds from the start of the websocket connection to the first live measurement."""
+        if (started := self._tibber_control.realtime.connect_started) is None:
+            return
+        delay = loop.time() - started
+        self._tibber_control.metrics.phase_histogram("rt_first_message").observe(delay)
+        _LOGGER.debug("Eerste realtime data voor %s na %.2f seconden", self.home_id, delay)
+
+    def _rt_deadline_expired(self) -> None:
+        """Re-arm the timer at the moved deadline, or ask for a reconnect when no data came in."""
+        self._rt_deadline_timer = None
+        if self._rt_stopped or self._rt_loop is None or self.has_real_time_consumption is False:
+            return
+        if self._rt_loop.time() < self._rt_deadline:
+            self._rt_deadline_timer = self._rt_loop.call_at(self._rt_deadline, self._rt_deadline_expired)
+            return
+        _LOGGER.warning("Geen realtime data ontvangen voor %s in %s seconden", self.home_id, RT_DATA_TIMEOUT)
+        self._tibber_control.realtime.request_reconnect()
+
+    async def _dispatch_rt_data(self, callback: Callable[..., Any]) -> None:
+        """Pass the live measurements in the mailbox to the callback.
+
+        :param callback: The function to call when data is received.
+        """
+        while True:
+            self._deliver_rt_data(callback, await self._rt_mailbox.get())
+
+    def _deliver_rt_data(self, callback: Callable[..., Any], data: dict[str, Any]) -> None:
+        """Pass one live measurement to the callback.
+
+        :param callback: The function to call when data is received.
+        :param data: The live measurement.
+        """
+        try:
+            callback(data)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Fout in realtime callback voor %s", self.name)
+
+    async def rt_resubscribe(self, refresh_info: bool = True) -> None:
+        """Resubscribe to Tibber data.
+
+        :param refresh_info: Refresh the home and account info first. False reuses the
+            cached home info, as after a reconnect that already refreshed the account info.
+        """
         self.rt_unsubscribe()
         _LOGGER.debug("Resubscribe, %s", self.home_id)
-        await asyncio.gather(
-            *[
-                self.update_info(),
-                self._tibber_control.update_info(),
-            ]
-        )
+        if refresh_info:
+            await asyncio.gather(
+                *[
+                    self.update_info(),
+                    self._tibber_control.update_info(),
+                ]
+            )
+        elif not self.info:
+            await self.update_info(max_age=HOME_INFO_MAX_AGE)
         if self._rt_callback is None:
             _LOGGER.warning("No callback set for rt_resubscribe")
             return
@@ -1071,17 +1443,30 @@ class TibberHome:
         """Unsubscribe to Tibber data."""
         _LOGGER.debug("Unsubscribe, %s", self.home_id)
         self._rt_stopped = True
+        if self._rt_deadline_timer is not None:
+            self._rt_deadline_timer.cancel()
+            self._rt_deadline_timer = None
         if self._rt_listener is None:
             return
         self._rt_listener.cancel()
         self._rt_listener = None
 
+    @property
+    def rt_mailbox_stats(self) -> dict[str, int]:
+        """Return the counters of the live measurement mailbox."""
+        return {
+            "depth": self._rt_mailbox.depth,
+            "max_depth": self._rt_mailbox.max_depth,
+            "received": self._rt_mailbox.put_count,
+            "dropped": self._rt_mailbox.drop_count,
+        }
+
     @property
     def rt_subscription_running(self) -> bool:
         """Is real time subscription running."""
         if not self._tibber_control.realtime.subscription_running:
             return False
-        if self._last_rt_data_received < dt.datetime.now(tz=dt.UTC) - dt.timedelta(seconds=60):
+        if self._rt_loop is None or self._rt_deadline < self._rt_loop.time():
             return False
         return True
 
@@ -1097,15 +1482,14 @@ class TibberHome:
         :param production: True to get production data instead of consumption
         """
         cons_or_prod_str = "production" if production else "consumption"
-        query = HISTORIC_DATA.format(
-            self.home_id,
-            cons_or_prod_str,
-            resolution,
-            n_data,
-            "profit" if production else "totalCost cost",
-            "",
-        )
-        if not (data := await self._tibber_control.execute(query, timeout=30)):
+        variables = {
+            "homeId": self.home_id,
+            "resolution": resolution,
+            "last": n_data,
+            "before": None,
+            "production": production,
+        }
+        if not (data := await self._tibber_control.execute(HISTORIC_DATA, variables, timeout=30)):
             _LOGGER.error("Could not get the data.")
             return []
         data = data["viewer"]["home"][cons_or_prod_str]
@@ -1113,20 +1497,74 @@ class TibberHome:
             return []
         return data["nodes"]
 
+    async def iter_historic_data(
+        self,
+        n_data: int,
+        after: str,
+        resolution: str = RESOLUTION_HOURLY,
+        production: bool = False,
+        page_size: int = HISTORIC_PAGE_SIZE,
+    ) -> AsyncIterator[tuple[list[HourlyNode], str | None]]:
+        """Page forwards through historic data, oldest page first.
+
+        Every page is requested with the end cursor of the previous one, so
+        only one page of nodes is held at a time. Yields (nodes, cursor) per
+        page, with the hourly nodes in time order and the cursor to pass as
+        `after` to continue with the newer data, or None if there is none.
+        Stops early, without an error, if a page could not be fetched.
+
+        :param n_data: The number of nodes to get from history.
+        :param after: The cursor to continue from, see history_cursor for the first page.
+        :param resolution: The resolution of the data.
+        :param production: True to get production data instead of consumption
+        :param page_size: The maximum number of nodes per request.
+        """
+        # pylint: disable=too-many-arguments
+        cons_or_prod_str = "production" if production else "consumption"
+        while n_data > 0:
+            variables = {
+                "homeId": self.home_id,
+                "resolution": resolution,
+                "first": min(page_size, n_data),
+                "after": after,
+                "production": production,
+            }
+            if not (
+                data := await self._tibber_control.execute(HISTORIC_DATA, variables, timeout=30, priority=PRIORITY_BULK)
+            ):
+                _LOGGER.error("Could not get the data.")
+                return
+            if (data := data["viewer"]["home"][cons_or_prod_str]) is None:
+                return
+            page_info = data.get("pageInfo") or {}
+            cursor = page_info.get("endCursor") if page_info.get("hasNextPage") and data["nodes"] else None
+            n_data -= len(data["nodes"])
+            yield [HourlyNode(node, production) for node in data["nodes"]], cursor
+            if not cursor:
+                return
+            after = cursor
+
     async def get_historic_price_data(
         self,
         resolution: str = RESOLUTION_HOURLY,
     ) -> list[dict[Any, Any]] | None:
         """Get historic price data.
         :param resolution: The resolution of the data. Can be HOURLY,
-            DAILY, WEEKLY, MONTHLY or ANNUAL
+            DAILY or MONTHLY, the price rating has no other resolutions.
         """
+        if resolution.upper() not in (RESOLUTION_HOURLY, RESOLUTION_DAILY, RESOLUTION_MONTHLY):
+            raise ValueError(
+                f"Unsupported price rating resolution {resolution}, "
+                f"use {RESOLUTION_HOURLY}, {RESOLUTION_DAILY} or {RESOLUTION_MONTHLY}"
+            )
         resolution = resolution.lower()
-        query = HISTORIC_PRICE.format(
-            self.home_id,
-            resolution,
-        )
-        if not (data := await self._tibber_control.execute(query)):
+        variables = {
+            "homeId": self.home_id,
+            "hourly": resolution == "hourly",
+            "daily": resolution == "daily",
+            "monthly": resolution == "monthly",
+        }
+        if not (data := await self._tibber_control.execute(HISTORIC_PRICE, variables)):
             _LOGGER.error("Could not get the price data.")
             return None
         return data["viewer"]["home"]["currentSubscription"]["priceRating"][resolution]["entries"]
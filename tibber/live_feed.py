@@ -0,0 +1,294 @@
+"""Minimal graphql-transport-ws client for the live measurement subscription."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator, Mapping
+from typing import TYPE_CHECKING, Any
+
+from websockets.exceptions import ConnectionClosed, ConnectionClosedError
+from websockets.typing import Subprotocol
+
+try:
+    from websockets.asyncio.client import connect as _connect
+
+    _HEADERS_ARG = "additional_headers"
+except ImportError:  # websockets < 13, the legacy client
+    from websockets.client import connect as _connect
+
+    _HEADERS_ARG = "extra_headers"
+
+from .const import LIVE_FEED_SUBPROTOCOL
+from .decoder import JSON_DECODE_ERRORS, json_loads
+from .exceptions import LiveFeedError
+from .gql_queries import LIVE_SUBSCRIBE
+
+if TYPE_CHECKING:
+    import ssl
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LiveMeasurement(Mapping[str, Any]):
+    """One live measurement of a home.
+
+    The fields are stored in slots. The measurement is also a mapping with the
+    keys of the API, so callers using ``data["timestamp"]`` or
+    ``data.get("power")`` keep working. The estimated hour consumption is the
+    only key that can be set.
+    """
+
+    __slots__ = (
+        "accumulated_consumption",
+        "accumulated_consumption_last_hour",
+        "accumulated_cost",
+        "accumulated_production",
+        "accumulated_production_last_hour",
+        "accumulated_reward",
+        "average_power",
+        "currency",
+        "current_l1",
+        "current_l2",
+        "current_l3",
+        "estimated_hour_consumption",
+        "last_meter_consumption",
+        "last_meter_production",
+        "max_power",
+        "min_power",
+        "power",
+        "power_factor",
+        "power_production",
+        "power_reactive",
+        "signal_strength",
+        "timestamp",
+        "voltage_phase1",
+        "voltage_phase2",
+        "voltage_phase3",
+    )
+
+    _KEYS = {
+        "accumulatedConsumption": "accumulated_consumption",
+        "accumulatedConsumptionLastHour": "accumulated_consumption_last_hour",
+        "accumulatedCost": "accumulated_cost",
+        "accumulatedProduction": "accumulated_production",
+        "accumulatedProductionLastHour": "accumulated_production_last_hour",
+        "accumulatedReward": "accumulated_reward",
+        "averagePower": "average_power",
+        "currency": "currency",
+        "currentL1": "current_l1",
+        "currentL2": "current_l2",
+        "currentL3": "current_l3",
+        "estimatedHourConsumption": "estimated_hour_consumption",
+        "lastMeterConsumption": "last_meter_consumption",
+        "lastMeterProduction": "last_meter_production",
+        "maxPower": "max_power",
+        "minPower": "min_power",
+        "power": "power",
+        "powerFactor": "power_factor",
+        "powerProduction": "power_production",
+        "powerReactive": "power_reactive",
+        "signalStrength": "signal_strength",
+        "timestamp": "timestamp",
+        "voltagePhase1": "voltage_phase1",
+        "voltagePhase2": "voltage_phase2",
+        "voltagePhase3": "voltage_phase3",
+    }
+
+    def __init__(self, live: Mapping[str, Any]) -> None:
+        """Initialize the measurement from the liveMeasurement object of the API.
+
+        :param live: The liveMeasurement object, missing keys are None.
+        """
+        for key, name in self._KEYS.items():
+            setattr(self, name, live.get(key))
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by its API key."""
+        return getattr(self, self._KEYS[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set the estimated hour consumption."""
+        if key != "estimatedHourConsumption":
+            raise KeyError(key)
+        self.estimated_hour_consumption = value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the API keys."""
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        """Return the number of API keys."""
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        """Return the representation of the measurement."""
+        return f"LiveMeasurement({self.timestamp}, power={self.power})"
+
+
+def decode_next(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the data of a next message with the measurement as record.
+
+    :param payload: The payload of a next message.
+    """
+    if errors := payload.get("errors"):
+        raise LiveFeedError(errors[0].get("message", errors[0]))
+    return {"liveMeasurement": LiveMeasurement(payload["data"]["liveMeasurement"])}
+
+
+class LiveFeedClient:
+    """Client for the live measurements of all homes over one websocket.
+
+    Speaks the graphql-transport-ws protocol without a GraphQL client: the
+    subscription document is sent as is, and next messages are decoded into
+    LiveMeasurement records and handed to the subscription of the home by id.
+    Liveness is left to the deadline timers of the homes, so no timer is armed
+    per message.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        access_token: str,
+        user_agent: str,
+        ssl: ssl.SSLContext | None = None,
+        timeout: float = 30,
+    ) -> None:
+        """Initialize the client.
+
+        :param url: The websocket subscription url.
+        :param access_token: The access token to access the Tibber API with.
+        :param user_agent: User agent identifier for the platform running this.
+        :param ssl: The SSL context of the connection.
+        :param timeout: The seconds to wait for the connection to be acknowledged.
+        """
+        self.url = url
+        self._access_token = access_token
+        self._user_agent = user_agent
+        self._ssl = ssl
+        self._timeout = timeout
+        self._websocket: Any = None
+        self._reader: asyncio.Task[None] | None = None
+        self._ids = itertools.count(1)
+        self._subscriptions: dict[str, asyncio.Queue[dict[str, Any] | Exception | None]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Is the connection acknowledged and read."""
+        return self._reader is not None and not self._reader.done()
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        """Send a protocol message."""
+        assert self._websocket is not None
+        await self._websocket.send(json.dumps(message, separators=(",", ":")))
+
+    async def connect_async(self) -> None:
+        """Open the websocket and wait for the connection_ack of the server."""
+        self._websocket = await _connect(
+            self.url,
+            subprotocols=[Subprotocol(LIVE_FEED_SUBPROTOCOL)],
+            ssl=self._ssl,
+            ping_interval=30,
+            open_timeout=self._timeout,
+            **{_HEADERS_ARG: {"User-Agent": self._user_agent}},
+        )
+        try:
+            await self._send({"type": "connection_init", "payload": {"token": self._access_token}})
+            message = json_loads(await asyncio.wait_for(self._websocket.recv(), self._timeout))
+            if message.get("type") != "connection_ack":
+                raise LiveFeedError(f"Expected connection_ack, got {message.get('type')}")
+        except BaseException:
+            await self._websocket.close()
+            self._websocket = None
+            raise
+        self._reader = asyncio.create_task(self._read())
+
+    async def close_async(self) -> None:
+        """Close the websocket, running subscriptions end with ConnectionClosed."""
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._reader is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+            self._reader = None
+        self._websocket = None
+
+    async def _read(self) -> None:
+        """Read messages and hand them to the subscriptions until the connection closes."""
+        assert self._websocket is not None
+        error: Exception = ConnectionClosedError(None, None)
+        try:
+            async for raw in self._websocket:
+                try:
+                    message = json_loads(raw)
+                except JSON_DECODE_ERRORS:
+                    message = None
+                if not isinstance(message, dict):
+                    _LOGGER.warning("Live feed bericht zonder geldige JSON overgeslagen: %s", raw)
+                    continue
+                kind = message.get("type")
+                if kind == "next":
+                    if (queue := self._subscriptions.get(message.get("id"))) is not None:
+                        try:
+                            item: dict[str, Any] | Exception = decode_next(message["payload"])
+                        except LiveFeedError as err:
+                            item = err
+                        except (AttributeError, KeyError, TypeError):
+                            # Een frame zonder liveMeasurement beeindigt de subscription niet
+                            _LOGGER.warning("Ongeldig live feed bericht overgeslagen: %s", message)
+                            continue
+                        queue.put_nowait(item)
+                elif kind == "ping":
+                    await self._send({"type": "pong"})
+                elif kind == "error":
+                    if (queue := self._subscriptions.get(message.get("id"))) is not None:
+                        queue.put_nowait(LiveFeedError(str(message.get("payload"))))
+                elif kind == "complete":
+                    if (queue := self._subscriptions.get(message.get("id"))) is not None:
+                        queue.put_nowait(None)
+        except ConnectionClosed as closed:
+            error = closed
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Fout in live feed ontvangst: %s", err, exc_info=True)
+            error = err
+        finally:
+            for queue in self._subscriptions.values():
+                queue.put_nowait(error)
+
+    async def subscribe(self, home_id: str) -> AsyncIterator[dict[str, Any]]:
+        """Subscribe to the live measurements of a home.
+
+        Yields the data of every next message, as the gql session does, with
+        the measurement as LiveMeasurement record.
+
+        :param home_id: The id of the home.
+        """
+        if not self.running:
+            raise ConnectionClosedError(None, None)
+        subscription_id = str(next(self._ids))
+        queue: asyncio.Queue[dict[str, Any] | Exception | None] = asyncio.Queue()
+        self._subscriptions[subscription_id] = queue
+        try:
+            await self._send(
+                {
+                    "id": subscription_id,
+                    "type": "subscribe",
+                    "payload": {"query": LIVE_SUBSCRIBE, "variables": {"homeId": home_id}},
+                }
+            )
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            del self._subscriptions[subscription_id]
+            if self.running:
+                # Server laten stoppen met sturen als de home niet meer luistert
+                with contextlib.suppress(ConnectionClosed):
+                    await self._send({"id": subscription_id, "type": "complete"})
@@ -0,0 +1,64 @@
+"""Latest-value mailbox between the realtime reader and its consumer."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+class LatestValueMailbox(Generic[_T]):
+    """Bounded mailbox in which the newest values win.
+
+    The reader puts values without ever waiting. When the consumer lags
+    behind and the mailbox is full, the oldest value is dropped, so the
+    consumer gets the newest values instead of replaying stale ones.
+    """
+
+    def __init__(self, maxsize: int = 1) -> None:
+        """Initialize the mailbox.
+
+        :param maxsize: The number of values kept for the consumer.
+        """
+        self._values: deque[_T] = deque(maxlen=maxsize)
+        self._waiter: asyncio.Future[None] | None = None
+        self.put_count: int = 0
+        self.drop_count: int = 0
+        self.max_depth: int = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of values waiting for the consumer."""
+        return len(self._values)
+
+    def put(self, value: _T) -> None:
+        """Add a value, dropping the oldest one when the mailbox is full."""
+        if len(self._values) == self._values.maxlen:
+            self.drop_count += 1
+        self._values.append(value)
+        self.put_count += 1
+        self.max_depth = max(self.max_depth, len(self._values))
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self) -> _T:
+        """Wait for and return the oldest value in the mailbox."""
+        while not self._values:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._values.popleft()
+
+    def drain(self) -> list[_T]:
+        """Remove and return the waiting values, oldest first."""
+        values = list(self._values)
+        self._values.clear()
+        return values
+
+    def clear(self) -> None:
+        """Remove the waiting values."""
+        self._values.clear()
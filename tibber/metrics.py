@@ -0,0 +1,166 @@
+"""Metrics of Tibber API requests and update phases."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .const import LATENCY_BUCKETS
+
+
+class Histogram:
+    """Histogram of durations in seconds with fixed buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the histogram.
+
+        :param buckets: The upper bounds of the buckets, in ascending order.
+        """
+        self.buckets = buckets
+        # de laatste bucket telt alles boven de hoogste grens
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.last: float | None = None
+
+    def observe(self, seconds: float) -> None:
+        """Add a duration."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    @property
+    def average(self) -> float | None:
+        """Return the average duration, None without durations."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding the given fraction of durations.
+
+        The bound is capped at the maximum duration, which is also returned
+        for the durations above the highest bound.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dict for diagnostics."""
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "last": self.last,
+            "average": self.average,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class QueryMetrics:
+    """Metrics of the requests of one GraphQL operation."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests: int = 0
+        self.errors: int = 0
+        self.cache_hits: int = 0
+        self.coalesced: int = 0
+        self.bytes_out: int = 0
+        self.bytes_in: int = 0
+        # herhaalde pogingen per HTTP status of exceptie
+        self.retries: dict[str, int] = {}
+        self.latency = Histogram()
+
+    def add_retry(self, reason: str) -> None:
+        """Count a retried request."""
+        self.retries[reason] = self.retries.get(reason, 0) + 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dict for diagnostics."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "retries": dict(self.retries),
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ApiMetrics:
+    """Metrics per GraphQL operation and per update phase.
+
+    Request latency is measured per HTTP attempt, from sending the request
+    until the response is decoded, without the time waiting for the
+    request scheduler. Bytes in are the Content-Length of the (compressed)
+    response, or the decoded size without one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.queries: dict[str, QueryMetrics] = {}
+        self.phases: dict[str, Histogram] = {}
+
+    def query(self, operation: str) -> QueryMetrics:
+        """Return the metrics of an operation."""
+        if (metrics := self.queries.get(operation)) is None:
+            metrics = self.queries[operation] = QueryMetrics()
+        return metrics
+
+    def phase_histogram(self, name: str) -> Histogram:
+        """Return the histogram of an update phase."""
+        if (histogram := self.phases.get(name)) is None:
+            histogram = self.phases[name] = Histogram()
+        return histogram
+
+    def last_duration(self, name: str) -> float | None:
+        """Return the last duration of an update phase, None if it did not run yet."""
+        return histogram.last if (histogram := self.phases.get(name)) is not None else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as an update phase, also when it fails."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phase_histogram(name).observe(time.monotonic() - start)
+
+    @property
+    def bytes_in(self) -> int:
+        """Return the bytes received over all operations."""
+        return sum(metrics.bytes_in for metrics in self.queries.values())
+
+    @property
+    def bytes_out(self) -> int:
+        """Return the bytes sent over all operations."""
+        return sum(metrics.bytes_out for metrics in self.queries.values())
+
+    @property
+    def retries(self) -> int:
+        """Return the number of retried requests over all operations."""
+        return sum(sum(metrics.retries.values()) for metrics in self.queries.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dict for diagnostics."""
+        return {
+            "queries": {operation: metrics.as_dict() for operation, metrics in self.queries.items()},
+            "phases": {name: histogram.as_dict() for name, histogram in self.phases.items()},
+        }
@@ -0,0 +1,331 @@
+"""Price timeline for a Tibber home."""
+
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import heapq
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+PRICE_SLOT_SECONDS = 15 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class PriceStats:
+    """Aggregated prices of one price column during one day."""
+
+    min: float
+    max: float
+    sum: float
+    count: int
+
+    @property
+    def avg(self) -> float:
+        """Return the average price."""
+        return self.sum / self.count
+
+
+@dataclass(frozen=True, slots=True)
+class DayPriceStats:
+    """Aggregated total and energy prices of one local day."""
+
+    total: PriceStats | None
+    energy: PriceStats | None
+
+
+@dataclass(frozen=True, slots=True)
+class CheapestWindow:
+    """The cheapest set of price slots found for a duration."""
+
+    start: dt.datetime
+    end: dt.datetime
+    average: float
+    slots: tuple[PriceSlot, ...]
+
+
+def _aggregate(prices: list[float]) -> PriceStats | None:
+    """Aggregate a list of prices, in timeline order."""
+    if not prices:
+        return None
+    return PriceStats(min(prices), max(prices), sum(prices), len(prices))
+
+
+class PriceSlot(Mapping[str, Any]):
+    """Price of one slot of the price info.
+
+    The fields are stored in slots instead of a per-entry dict. The slot is
+    also a read-only mapping with the keys of the former price info dicts,
+    so existing callers using ``entry["total"]`` or ``entry.get("energy")``
+    keep working.
+    """
+
+    __slots__ = ("energy", "energy_ws", "energy_wsi", "level", "start", "starts_at", "tax", "timestamp", "total")
+
+    _KEYS = ("total", "energy", "energy_ws", "energy_wsi", "tax", "level", "timestamp")
+
+    def __init__(
+        self,
+        starts_at: str,
+        timestamp: dt.datetime,
+        total: float | None,
+        energy: float | None,
+        energy_ws: float | None,
+        energy_wsi: float | None,
+        tax: float | None,
+        level: str | None,
+    ) -> None:
+        """Initialize the price slot.
+
+        :param starts_at: The startsAt string from the API, used as key.
+        :param timestamp: The parsed startsAt, with the offset from the API.
+        """
+        # pylint: disable=too-many-arguments
+        self.starts_at = starts_at
+        self.timestamp = timestamp
+        self.start = timestamp.timestamp()
+        self.total = total
+        self.energy = energy
+        self.energy_ws = energy_ws
+        self.energy_wsi = energy_wsi
+        self.tax = tax
+        self.level = level
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by its price info key."""
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the price info keys."""
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        """Return the number of price info keys."""
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        """Return the representation of the price slot."""
+        return f"PriceSlot({self.starts_at}, total={self.total}, energy={self.energy}, level={self.level})"
+
+
+class PriceLevelView(Mapping[str, str | None]):
+    """Read-only mapping of startsAt to price level, backed by the price slots."""
+
+    __slots__ = ("_slots",)
+
+    def __init__(self, slots: Mapping[str, PriceSlot]) -> None:
+        """Initialize the view."""
+        self._slots = slots
+
+    def __getitem__(self, key: str) -> str | None:
+        """Return the price level of a slot."""
+        return self._slots[key].level
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the startsAt keys."""
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self._slots)
+
+
+class PriceTimeline:
+    """Immutable, time-sorted price timeline.
+
+    The price slots are stored ordered by start time, together with parallel
+    tuples of their start epochs and price columns, so the slot covering a
+    moment is found with a binary search instead of a scan over all entries.
+    """
+
+    __slots__ = ("energies", "keys", "slots", "starts", "totals")
+
+    def __init__(self, slots: Iterable[PriceSlot] = ()) -> None:
+        """Initialize the timeline.
+
+        :param slots: The price slots, in any order.
+        """
+        self.slots: tuple[PriceSlot, ...] = tuple(sorted(slots, key=lambda slot: slot.start))
+        self.starts: array[float] = array("d", (slot.start for slot in self.slots))
+        self.keys: tuple[str, ...] = tuple(slot.starts_at for slot in self.slots)
+        self.totals: tuple[float | None, ...] = tuple(slot.total for slot in self.slots)
+        self.energies: tuple[float | None, ...] = tuple(slot.energy for slot in self.slots)
+
+    def __len__(self) -> int:
+        """Return the number of price slots."""
+        return len(self.starts)
+
+    def index_at(self, moment: dt.datetime | float) -> int | None:
+        """Return the index of the slot covering the given moment, if any.
+
+        :param moment: An aware datetime or a POSIX timestamp.
+        """
+        if isinstance(moment, dt.datetime):
+            moment = moment.timestamp()
+        index = bisect.bisect_right(self.starts, moment) - 1
+        if index < 0 or moment >= self.starts[index] + PRICE_SLOT_SECONDS:
+            return None
+        return index
+
+    def index_from(self, moment: dt.datetime | float) -> int:
+        """Return the index of the first slot starting at or after the given moment."""
+        if isinstance(moment, dt.datetime):
+            moment = moment.timestamp()
+        return bisect.bisect_left(self.starts, moment)
+
+    def find_cheapest_window(
+        self,
+        n_slots: int,
+        earliest: float,
+        deadline: float,
+        contiguous: bool = True,
+        column: str = "total",
+    ) -> tuple[int, ...] | None:
+        """Return the timeline indexes of the cheapest slots between two moments.
+
+        A contiguous window is found with prefix sums and a sliding window, so
+        every window sum is O(1) and a query is O(n). Otherwise the cheapest
+        slots are picked individually. Slots without a price are never used,
+        and ties are resolved in favour of the earliest slots.
+
+        :param n_slots: The number of slots needed.
+        :param earliest: The earliest moment (POSIX timestamp). The slot
+            covering it may be used.
+        :param deadline: The moment (POSIX timestamp) the last slot must end by.
+        :param contiguous: True if the slots must be consecutive in time.
+        :param column: The price slot field to minimise, e.g. 'total'.
+        """
+        # pylint: disable=too-many-arguments
+        first = self.index_at(earliest)
+        if first is None:
+            first = self.index_from(earliest)
+        last = bisect.bisect_right(self.starts, deadline - PRICE_SLOT_SECONDS)
+        values = [getattr(slot, column) for slot in self.slots[first:last]]
+        if n_slots < 1 or len(values) < n_slots:
+            return None
+
+        if not contiguous:
+            candidates = [(value, index) for index, value in enumerate(values) if value is not None]
+            if len(candidates) < n_slots:
+                return None
+            return tuple(sorted(first + index for _, index in heapq.nsmallest(n_slots, candidates)))
+
+        # prefix sums of the prices, and of the missing prices and gaps so
+        # windows containing them can be skipped in O(1)
+        prefix = [0.0]
+        breaks = [0]
+        for index, value in enumerate(values):
+            prefix.append(prefix[-1] + (value or 0.0))
+            gap = index > 0 and self.starts[first + index] - self.starts[first + index - 1] != PRICE_SLOT_SECONDS
+            breaks.append(breaks[-1] + (value is None) + gap)
+
+        best: int | None = None
+        best_sum = 0.0
+        for start in range(len(values) - n_slots + 1):
+            end = start + n_slots
+            # a gap before the first slot of the window does not matter
+            if breaks[end] - breaks[start + 1] or values[start] is None:
+                continue
+            window_sum = prefix[end] - prefix[start]
+            if best is None or window_sum < best_sum:
+                best = start
+                best_sum = window_sum
+        if best is None:
+            return None
+        return tuple(range(first + best, first + best + n_slots))
+
+    def daily_stats(self, time_zone: dt.tzinfo) -> dict[dt.date, DayPriceStats]:
+        """Aggregate the total and energy prices per local day.
+
+        :param time_zone: The time zone that defines the day boundaries.
+        """
+        totals: dict[dt.date, list[float]] = {}
+        energies: dict[dt.date, list[float]] = {}
+        for start, total, energy in zip(self.starts, self.totals, self.energies):
+            day = dt.datetime.fromtimestamp(start, time_zone).date()
+            totals.setdefault(day, [])
+            energies.setdefault(day, [])
+            if total is not None:
+                totals[day].append(total)
+            if energy is not None:
+                energies[day].append(energy)
+        return {day: DayPriceStats(_aggregate(totals[day]), _aggregate(energies[day])) for day in totals}
+
+
+def _sort_positions(values: list[float]) -> list[int]:
+    """Return the position of every value in the stable ascending sort order."""
+    if np is not None:
+        order = np.argsort(np.asarray(values, dtype=float), kind="stable")
+        positions = np.empty(len(values), dtype=np.intp)
+        positions[order] = np.arange(len(values))
+        return positions.tolist()
+    order = sorted(range(len(values)), key=values.__getitem__)
+    positions = [0] * len(values)
+    for position, index in enumerate(order):
+        positions[index] = position
+    return positions
+
+
+class PriceRanks:
+    """Percentile ranks of every price slot within hour windows of its day.
+
+    For each window (first hour, last hour) the slots of a local day that
+    start within the window are ranked by price, from 0 for the cheapest slot
+    to 1 for the most expensive one. All ranks are computed once per price
+    update, so looking up the rank of a slot is a plain index.
+    """
+
+    __slots__ = ("_ranks",)
+
+    def __init__(
+        self,
+        timeline: PriceTimeline,
+        column: str,
+        windows: Iterable[tuple[int, int]],
+        time_zone: dt.tzinfo,
+    ) -> None:
+        """Initialize the ranks.
+
+        :param timeline: The price timeline to rank.
+        :param column: The price slot field to rank by, e.g. 'energy_wsi'.
+        :param windows: The (first hour, last hour) windows to rank within.
+        :param time_zone: The time zone that defines days and hours.
+        """
+        local_starts = [dt.datetime.fromtimestamp(start, time_zone) for start in timeline.starts]
+        values = [getattr(slot, column) for slot in timeline.slots]
+        self._ranks: dict[tuple[int, int], list[float | None]] = {}
+        for window in windows:
+            groups: dict[dt.date, list[int]] = {}
+            for index, local_start in enumerate(local_starts):
+                if values[index] is not None and window[0] <= local_start.hour <= window[1]:
+                    groups.setdefault(local_start.date(), []).append(index)
+            ranks: list[float | None] = [None] * len(values)
+            for indexes in groups.values():
+                if len(indexes) == 1:
+                    ranks[indexes[0]] = 0.5
+                    continue
+                positions = _sort_positions([values[index] for index in indexes])
+                for index, position in zip(indexes, positions):
+                    ranks[index] = position / (len(indexes) - 1)
+            self._ranks[window] = ranks
+
+    def __contains__(self, window: object) -> bool:
+        """Return True if the ranks for the window are computed."""
+        return window in self._ranks
+
+    def rank(self, index: int, window: tuple[int, int]) -> float | None:
+        """Return the rank of a slot within a window, None if not in the window.
+
+        :param index: The timeline index of the slot.
+        :param window: The (first hour, last hour) window.
+        """
+        return self._ranks[window][index]
@@ -1,15 +1,20 @@
 """Tibber RT connection."""
 
 import asyncio
-import datetime as dt
+import functools
 import logging
 import random
+import ssl
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
-from gql import Client
+from gql import Client, gql
+from graphql import DocumentNode
 
 from .exceptions import SubscriptionEndpointMissingError
+from .gql_queries import LIVE_SUBSCRIBE
 from .home import TibberHome
+from .live_feed import LiveFeedClient
 from .websocker_transport import TibberWebsocketsTransport
 
 LOCK_CONNECT = asyncio.Lock()
@@ -17,6 +22,17 @@ LOCK_CONNECT = asyncio.Lock()
 _LOGGER = logging.getLogger(__name__)
 
 
+def _create_ssl_context() -> ssl.SSLContext:
+    """Create the SSL context of the websocket connection, this loads the default certificates and blocks."""
+    return ssl.create_default_context()
+
+
+@functools.cache
+def _live_subscription() -> DocumentNode:
+    """Return the parsed live measurement subscription, the home is a variable so all homes share it."""
+    return gql(LIVE_SUBSCRIBE)
+
+
 class TibberRT:
     """Class to handle real time connection with the Tibber api."""
 
@@ -26,23 +42,34 @@ class TibberRT:
         access_token: str,
         timeout: int,
         user_agent: str,
+        update_info: Callable[[], Awaitable[Any]] | None = None,
+        native_live_feed: bool = False,
     ):
         """Initialize the Tibber connection.
 
         :param access_token: The access token to access the Tibber API with.
         :param timeout: The timeout in seconds to use when communicating with the Tibber API.
         :param user_agent: User agent identifier for the platform running this. Required if websession is None.
+        :param update_info: Refreshes the account info, and with it the subscription endpoint, once per reconnect.
+        :param native_live_feed: Use the graphql-transport-ws client of live_feed instead of the gql Client.
         """
         self._access_token: str = access_token
         self._timeout: int = timeout
         self._user_agent: str = user_agent
+        self._update_info = update_info
+        self._native_live_feed = native_live_feed
 
         self._sub_endpoint: str | None = None
         self._homes: list[TibberHome] = []
         self._watchdog_runner: None | asyncio.Task[Any] = None
         self._watchdog_running: bool = False
+        self._reconnect_needed: asyncio.Event = asyncio.Event()
+        # Gezet zodra de server de verbinding met connection_ack heeft bevestigd
+        self._connected: asyncio.Event = asyncio.Event()
+        self.connect_started: float | None = None
 
-        self.sub_manager: Client | None = None
+        self.sub_manager: Client | LiveFeedClient | None = None
+        self._ssl_context: ssl.SSLContext | None = None
 
     async def disconnect(self) -> None:
         """Stop subscription manager.
@@ -54,17 +81,21 @@ class TibberRT:
             self._watchdog_running = False
             self._watchdog_runner.cancel()
             self._watchdog_runner = None
+        self._connected.clear()
         for home in self._homes:
             home.rt_unsubscribe()
         if self.sub_manager is None:
             return
         try:
-            if not hasattr(self.sub_manager, "session"):
-                return
-            await self.sub_manager.close_async()  # type: ignore
+            await self._close_sub_manager()
         finally:
             self.sub_manager = None
 
+    async def _close_sub_manager(self) -> None:
+        """Close the connection of the subscription manager, if it has one."""
+        if isinstance(self.sub_manager, LiveFeedClient) or hasattr(self.sub_manager, "session"):
+            await self.sub_manager.close_async()  # type: ignore
+
     async def connect(self) -> None:
         """Start subscription manager."""
         await self._create_sub_manager()
@@ -76,89 +107,75 @@ class TibberRT:
                 return
             if self._watchdog_runner is None:
                 _LOGGER.debug("Starting watchdog")
+                # een verzoek van voor een eerdere disconnect hoort niet bij deze verbinding
+                self._reconnect_needed.clear()
                 self._watchdog_running = True
                 self._watchdog_runner = asyncio.create_task(self._watchdog())
+            self.connect_started = asyncio.get_running_loop().time()
             await self.sub_manager.connect_async()  # type: ignore
+            self._connected.set()
 
     async def _create_sub_manager(self) -> None:
         """Create subscription manager.
 
-        This does potentially blocking SSL context setup off the event loop
-        using asyncio.to_thread and then constructs the Client with a
-        TibberWebsocketsTransport that receives the prepared SSL context.
+        The SSL context is created once, off the event loop using
+        asyncio.to_thread, and reused by every later connection. The Client
+        gets a TibberWebsocketsTransport with the prepared SSL context, or
+        the LiveFeedClient gets it when the native live feed is used.
         """
         if self.sub_endpoint is None:
             raise SubscriptionEndpointMissingError("Subscription endpoint not initialized")
         if self.sub_manager is not None:
             return
 
-        # Create SSL context off the event loop to avoid blocking the loop
-        def _create_ssl_context():
-            import ssl
-
-            ctx = ssl.create_default_context()
-            # load_default_certs may be blocking depending on platform
-            ctx.load_default_certs()
-            return ctx
-
-        ssl_ctx = await asyncio.to_thread(_create_ssl_context)
+        if self._ssl_context is None:
+            # Create SSL context off the event loop to avoid blocking the loop
+            self._ssl_context = await asyncio.to_thread(_create_ssl_context)
 
+        if self._native_live_feed:
+            self.sub_manager = LiveFeedClient(
+                self.sub_endpoint,
+                self._access_token,
+                self._user_agent,
+                ssl=self._ssl_context,
+            )
+            return
         self.sub_manager = Client(
             transport=TibberWebsocketsTransport(
                 self.sub_endpoint,
                 self._access_token,
                 self._user_agent,
-                ssl=ssl_ctx,
+                ssl=self._ssl_context,
             ),
         )
 
     async def _watchdog(self) -> None:  # noqa: PLR0912
-        """Watchdog to keep connection alive."""
+        """Watchdog to keep connection alive.
+
+        Sleeps until a home asks for a reconnect, because its subscription
+        ended or its deadline timer expired without data.
+        """
         assert self.sub_manager is not None
-        assert isinstance(self.sub_manager.transport, TibberWebsocketsTransport)
 
         await asyncio.sleep(60)
 
         _retry_count = 0
-        next_test_all_homes_running = dt.datetime.now(tz=dt.UTC)
         while self._watchdog_running:
-            await asyncio.sleep(5)
-            if self.sub_manager.transport.running and self.sub_manager.transport.reconnect_at > dt.datetime.now(
-                tz=dt.UTC
-            ):
-                if dt.datetime.now(tz=dt.UTC) > next_test_all_homes_running:
-                    is_running = True
-                    for home in self._homes:
-                        _LOGGER.debug(
-                            "Watchdog: Checking if home %s is alive, %s, %s",
-                            home.home_id,
-                            home.has_real_time_consumption,
-                            home.rt_subscription_running,
-                        )
-                        if home.has_real_time_consumption is False:
-                            continue
-                        if not home.rt_subscription_running:
-                            is_running = False
-                            next_test_all_homes_running = dt.datetime.now(tz=dt.UTC) + dt.timedelta(seconds=60)
-                            break
-                        _LOGGER.debug(
-                            "Watchdog: Home %s is alive",
-                            home.home_id,
-                        )
-                    if is_running:
-                        _retry_count = 0
-                        _LOGGER.debug("Watchdog: Connection is alive")
-                        continue
-
-            self.sub_manager.transport.reconnect_at = dt.datetime.now(tz=dt.UTC) + dt.timedelta(seconds=self._timeout)
-            _LOGGER.warning(
-                "Watchdog: WebSocket verbinding verbroken, herverbinden over %s seconden",
-                self._timeout,
-            )
+            await self._reconnect_needed.wait()
+            if not self._watchdog_running:
+                return
+
+            _LOGGER.warning("Watchdog: WebSocket verbinding verbroken, herverbinden")
+            # Verzoeken vanaf hier horen bij de nieuwe verbinding. De homes eerst stoppen,
+            # anders vragen hun door het sluiten beëindigde subscriptions opnieuw om herverbinden.
+            self._reconnect_needed.clear()
+            for home in self._homes:
+                home.rt_unsubscribe()
+            self._connected.clear()
+            self.connect_started = asyncio.get_running_loop().time()
 
             try:
-                if hasattr(self.sub_manager, "session"):
-                    await self.sub_manager.close_async()  # type: ignore
+                await self._close_sub_manager()
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.debug("Error in watchdog close (verwacht na verbindingsverlies)")
 
@@ -167,8 +184,12 @@ class TibberRT:
                 return
 
             await self._create_sub_manager()
+            # De account info (en het subscription endpoint) wordt één keer ververst, naast het herverbinden
+            refresh_info = asyncio.create_task(self._refresh_info())
             try:
                 await self.sub_manager.connect_async()  # type: ignore
+                # connect_async keert pas terug na connection_ack, de homes kunnen direct abonneren
+                self._connected.set()
                 await self._resubscribe_homes()
             except Exception as err:  # pylint: disable=broad-except
                 # Exponential backoff met maximum
@@ -211,15 +232,54 @@ class TibberRT:
                         pass  # Ignore close errors, we're resetting anyway
                     _retry_count = 0  # Reset counter na connection reset
                 
+                await refresh_info
                 await asyncio.sleep(delay_seconds)
+                self._reconnect_needed.set()
             else:
                 _LOGGER.debug("Watchdog: Reconnected successfully")
+                await refresh_info
+                _retry_count = 0
                 await asyncio.sleep(60)
 
+    def request_reconnect(self) -> None:
+        """Wake the watchdog to reconnect and resubscribe the homes."""
+        self._reconnect_needed.set()
+
+    async def _refresh_info(self) -> None:
+        """Refresh the account info, used for the subscription endpoint of the next connection."""
+        if self._update_info is None:
+            return
+        try:
+            await self._update_info()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Account info niet ververst na herverbinden: %s", err)
+
     async def _resubscribe_homes(self) -> None:
-        """Resubscribe to all homes."""
+        """Resubscribe to all homes with their cached info."""
         _LOGGER.debug("Resubscribing to homes")
-        await asyncio.gather(*[home.rt_resubscribe() for home in self._homes])
+        await asyncio.gather(*[home.rt_resubscribe(refresh_info=False) for home in self._homes])
+
+    async def wait_running(self, timeout: float) -> bool:
+        """Wait until the server acknowledged the connection, return if the subscription is running.
+
+        :param timeout: The seconds to wait at most.
+        """
+        if not self.subscription_running:
+            try:
+                await asyncio.wait_for(self._connected.wait(), timeout)
+            except TimeoutError:
+                return False
+        return self.subscription_running
+
+    def subscribe(self, home_id: str) -> AsyncIterator[dict[str, Any]]:
+        """Subscribe to the live measurements of a home, yields the data of every message.
+
+        :param home_id: The id of the home.
+        """
+        assert self.sub_manager is not None
+        if isinstance(self.sub_manager, LiveFeedClient):
+            return self.sub_manager.subscribe(home_id)
+        return self.sub_manager.session.subscribe(_live_subscription(), variable_values={"homeId": home_id})
 
     def add_home(self, home: TibberHome) -> bool:
         """Add home to real time subscription."""
@@ -233,6 +293,8 @@ class TibberRT:
     @property
     def subscription_running(self) -> bool:
         """Is real time subscription running."""
+        if isinstance(self.sub_manager, LiveFeedClient):
+            return self.sub_manager.running
         return (
             self.sub_manager is not None
             and isinstance(self.sub_manager.transport, TibberWebsocketsTransport)
@@ -248,5 +310,7 @@ class TibberRT:
     def sub_endpoint(self, sub_endpoint: str) -> None:
         """Set subscription endpoint."""
         self._sub_endpoint = sub_endpoint
-        if self.sub_manager is not None and isinstance(self.sub_manager.transport, TibberWebsocketsTransport):
+        if isinstance(self.sub_manager, LiveFeedClient):
+            self.sub_manager.url = sub_endpoint
+        elif self.sub_manager is not None and isinstance(self.sub_manager.transport, TibberWebsocketsTransport):
             self.sub_manager.transport.url = sub_endpoint
@@ -1,10 +1,13 @@
 """Tibber API response handler"""
 
+import datetime as dt
 import logging
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
+from importlib.util import find_spec
 from typing import Any
 
-from aiohttp import ClientResponse
+from aiohttp import ClientResponse, hdrs
 
 from .const import (
     API_ERR_CODE_UNAUTH,
@@ -12,6 +15,7 @@ from .const import (
     HTTP_CODES_FATAL,
     HTTP_CODES_RETRIABLE,
 )
+from .decoder import json_loads
 from .exceptions import (
     FatalHttpExceptionError,
     InvalidLoginError,
@@ -20,6 +24,9 @@ from .exceptions import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# aiohttp pakt br alleen uit als Brotli of brotlicffi geïnstalleerd is
+ACCEPT_ENCODING = "gzip, deflate, br" if find_spec("brotli") or find_spec("brotlicffi") else "gzip, deflate"
+
 
 def extract_error_details(errors: list[Any], default_message: str) -> tuple[str, str]:
     """Tries to extract the error message and code from the provided 'errors' dictionary"""
@@ -28,6 +35,23 @@ def extract_error_details(errors: list[Any], default_message: str) -> tuple[str,
     return errors[0].get("extensions").get("code"), errors[0].get("message")
 
 
+def extract_retry_after(response: ClientResponse) -> float | None:
+    """Returns the Retry-After header in seconds, if present"""
+    if not (value := response.headers.get(hdrs.RETRY_AFTER)):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt.UTC)
+    return max(0.0, (retry_at - dt.datetime.now(dt.UTC)).total_seconds())
+
+
 async def extract_response_data(response: ClientResponse) -> dict[Any, Any]:
     """Extracts the response as JSON or throws a HttpException"""
     _LOGGER.debug("Response status: %s", response.status)
@@ -40,6 +64,7 @@ async def extract_response_data(response: ClientResponse) -> dict[Any, Any]:
                 response.status,
                 f"Server error with content type: {response.content_type}",
                 API_ERR_CODE_UNKNOWN,
+                extract_retry_after(response),
             )
         else:
             raise FatalHttpExceptionError(
@@ -48,7 +73,8 @@ async def extract_response_data(response: ClientResponse) -> dict[Any, Any]:
                 API_ERR_CODE_UNKNOWN,
             )
 
-    result = await response.json()
+    # decode the raw body with the fastest available JSON decoder
+    result = json_loads(await response.read())
 
     if response.status == HTTPStatus.OK:
         return result
@@ -56,7 +82,12 @@ async def extract_response_data(response: ClientResponse) -> dict[Any, Any]:
     if response.status in HTTP_CODES_RETRIABLE:
         error_code, error_message = extract_error_details(result.get("errors", []), str(response.content))
 
-        raise RetryableHttpExceptionError(response.status, message=error_message, extension_code=error_code)
+        raise RetryableHttpExceptionError(
+            response.status,
+            message=error_message,
+            extension_code=error_code,
+            retry_after=extract_retry_after(response),
+        )
 
     if response.status in HTTP_CODES_FATAL:
         error_code, error_message = extract_error_details(result.get("errors", []), "request failed")
@@ -67,4 +98,6 @@ async def extract_response_data(response: ClientResponse) -> dict[Any, Any]:
 
     error_code, error_message = extract_error_details(result.get("errors", []), "N/A")
     # if reached here the HTTP response code is not currently handled
-    raise FatalHttpExceptionError(response.status, f"Unhandled error: {error_message}", error_code)
+    raise FatalHttpExceptionError(
+        response.status, f"Unhandled error: {error_message}", error_code, extract_retry_after(response)
+    )
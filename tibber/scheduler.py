@@ -0,0 +1,204 @@
+"""Client-side rate limiting and circuit breaking of Tibber API requests."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from .const import BACKOFF_BASE, BACKOFF_MAX, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Return the delay before retrying a failed request.
+
+    The delay doubles with every attempt, up to a maximum, with random
+    jitter so retries of concurrent requests do not line up. A Retry-After
+    time of the server is never undercut.
+
+    :param attempt: The number of the failed attempt, starting at 0.
+    :param retry_after: The Retry-After time in seconds, if the server sent one.
+    """
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class RequestScheduler:
+    """Token bucket that hands out request slots by priority.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second. A request takes one token. When the bucket is empty, requests
+    wait and are let through lowest priority value first, in arrival order
+    within a priority. The bucket can be paused, e.g. after a 429 response,
+    so queued requests do not run into the same throttling.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize the scheduler.
+
+        :param rate: The number of requests per second in the long run.
+        :param burst: The number of requests that can be sent at once.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.wait_count: int = 0
+
+    async def acquire(self, priority: int) -> None:
+        """Wait until a request with the given priority may be sent."""
+        if not self._waiters and self._take():
+            return
+        self.wait_count += 1
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed out just before the cancellation
+                self._tokens += 1
+                self._dispatch()
+            raise
+
+    def pause(self, seconds: float) -> None:
+        """Do not hand out slots for the given number of seconds."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._schedule()
+
+    def _refill(self) -> float:
+        """Add the tokens earned since the last refill and return the time."""
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        return now
+
+    def _take(self) -> bool:
+        """Take a token if one is available and the bucket is not paused."""
+        now = self._refill()
+        if now < self._paused_until or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Let waiting requests through while tokens are available."""
+        self._wakeup = None
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take():
+                break
+            heapq.heappop(self._waiters)[2].set_result(None)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        """Schedule the next dispatch for when a token is available."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if not self._waiters:
+            return
+        now = self._refill()
+        delay = max(self._paused_until - now, (1 - self._tokens) / self._rate, 0)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class CircuitBreaker:
+    """Holds back requests while the API keeps failing.
+
+    After `threshold` failed requests in a row the circuit opens and requests
+    are refused without being sent. After the reset timeout one probe
+    request is let through (half-open): if it succeeds the circuit closes,
+    otherwise it opens again with a doubled timeout, up to a maximum.
+    Requests get a ticket from allow(), so results of requests that were sent
+    before the circuit opened do not count as the result of the probe.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float, max_reset_timeout: float) -> None:
+        """Initialize the circuit breaker.
+
+        :param threshold: The number of failed requests in a row that opens the circuit.
+        :param reset_timeout: The seconds to wait before the first probe request.
+        :param max_reset_timeout: The maximum seconds to wait between probe requests.
+        """
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe: int | None = None
+        self._probe_ids = itertools.count(1)
+        self.open_count: int = 0
+        self.rejected_count: int = 0
+
+    @property
+    def state(self) -> str:
+        """Return the state: closed, open or half_open."""
+        if self._opened_at is None:
+            return CIRCUIT_CLOSED
+        if self._probe is not None or time.monotonic() - self._opened_at >= self._timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    def allow(self) -> int | None:
+        """Return the ticket of a request that may be sent, or None if it is refused.
+
+        The ticket is 0 while the circuit is closed. When half-open the request
+        takes the probe slot and gets the ticket of the probe.
+        """
+        state = self.state
+        if state == CIRCUIT_CLOSED:
+            return 0
+        if state == CIRCUIT_HALF_OPEN and self._probe is None:
+            self._probe = next(self._probe_ids)
+            return self._probe
+        self.rejected_count += 1
+        return None
+
+    def release_probe(self, ticket: int) -> None:
+        """Free the probe slot if the request of the ticket ended without a recorded result."""
+        if ticket == self._probe:
+            self._probe = None
+
+    def record_success(self, ticket: int) -> None:
+        """Close the circuit after a successful request.
+
+        While the circuit is open only the result of the probe counts.
+        """
+        if self._opened_at is not None and ticket != self._probe:
+            return
+        self._failures = 0
+        self._opened_at = None
+        self._probe = None
+        self._timeout = self._reset_timeout
+
+    def record_failure(self, ticket: int) -> None:
+        """Count a failed request and open the circuit if needed.
+
+        While the circuit is open only a failed probe opens it again, with a
+        doubled timeout.
+        """
+        self._failures += 1
+        if self._opened_at is not None:
+            if ticket == self._probe:
+                self._probe = None
+                self._timeout = min(self._timeout * 2, self._max_reset_timeout)
+                self._opened_at = time.monotonic()
+            return
+        if self._failures < self._threshold:
+            return
+        self.open_count += 1
+        self._opened_at = time.monotonic()
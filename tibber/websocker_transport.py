@@ -1,7 +1,6 @@
 """Websocket transport for Tibber."""
 
 import asyncio
-import datetime as dt
 import logging
 
 from gql.transport.exceptions import TransportClosed
@@ -28,7 +27,6 @@ class TibberWebsocketsTransport(WebsocketsTransport):
         )
         self._user_agent: str = user_agent
         self._timeout: int = 90
-        self.reconnect_at: dt.datetime = dt.datetime.now(tz=dt.UTC) + dt.timedelta(seconds=self._timeout)
 
     @property
     def running(self) -> bool:
@@ -42,7 +40,6 @@ class TibberWebsocketsTransport(WebsocketsTransport):
         except TimeoutError:
             _LOGGER.error("No data received from Tibber for %s seconds", self._timeout)
             raise
-        self.reconnect_at = dt.datetime.now(tz=dt.UTC) + dt.timedelta(seconds=self._timeout)
         return msg
 
     async def close(self) -> None: